@@ -0,0 +1,143 @@
+import json
+import socket
+import threading
+from typing import Callable
+
+class ProxyStub():
+    """
+    키움증권 프록시의 통신 규약을 흉내내는 벤치마크용 서버
+
+    Market이 보내는 요청을 한 줄씩 읽어 handler가 만든 응답을 돌려줍니다.
+    실제 키움증권 서버와 통신하지 않으므로 측정값에는 클라이언트의 오버헤드만 포함됩니다.
+    """
+
+    def __init__(self, port: int = 53939):
+        self._server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._server.bind(('127.0.0.1', port))
+        self._server.listen(1)
+        self._socket = None
+        self._send_lock = threading.Lock()
+        self._order_count = 0
+        self.balance = {}
+        self.deposit = 100_000_000
+        self.handlers = {
+            'login': lambda kwargs: [_message('login_result', '', 0)],
+            'get_balance': lambda kwargs: [tr_result(kwargs, self.balance)],
+            'get_deposit': lambda kwargs: [tr_result(kwargs, self.deposit)],
+            'get_price_info': lambda kwargs: [tr_result(kwargs, price_info(1000))],
+            'send_order': self._handle_send_order,
+        }
+        self._thread = threading.Thread(target=self._serve, name='proxy_stub', daemon=True)
+        self._thread.start()
+
+    def add_handler(self, method: str, handler: Callable) -> None:
+        """
+        요청을 처리할 handler를 추가합니다.
+
+        Parameters
+        ----------
+        method : str
+            처리할 요청의 메서드 이름입니다.
+        handler : Callable
+            handler(kwargs) 형태로 호출되어 응답 메시지의 리스트를 반환합니다.
+        """
+        self.handlers[method] = handler
+
+    def send(self, messages: list[dict]) -> None:
+        """
+        메시지들을 한번에 Market으로 보냅니다.
+
+        Parameters
+        ----------
+        messages : list[dict]
+            프록시가 보내는 형식의 메시지 리스트입니다.
+        """
+        self.send_raw(''.join(json.dumps(message) + '\n' for message in messages).encode())
+
+    def send_raw(self, data: bytes) -> None:
+        """
+        미리 직렬화된 메시지들을 Market으로 보냅니다.
+
+        Parameters
+        ----------
+        data : bytes
+            줄바꿈으로 구분된 JSON 메시지들입니다.
+        """
+        with self._send_lock:
+            self._socket.sendall(data)
+
+    def close(self) -> None:
+        """
+        연결을 끊습니다. Market의 receiver 쓰레드는 이로 인해 종료됩니다.
+        """
+        if self._socket is not None:
+            self._socket.close()
+        self._server.close()
+
+    def _serve(self):
+        self._socket, _ = self._server.accept()
+        buffer = b''
+        while True:
+            try:
+                chunk = self._socket.recv(65536)
+            except OSError:
+                break
+            if not chunk:
+                break
+            buffer += chunk
+            *lines, buffer = buffer.split(b'\n')
+            responses = []
+            for line in lines:
+                request = json.loads(line)
+                handler = self.handlers.get(request['method'])
+                if handler is not None:
+                    responses.extend(handler(request['kwargs']))
+            if responses:
+                self.send(responses)
+
+    def _handle_send_order(self, kwargs: dict) -> list[dict]:
+        self._order_count += 1
+        order_number = f'{self._order_count:07}'
+        order_dict = kwargs['order_dict']
+        return [
+            tr_result(kwargs, order_number),
+            _message('order_result', order_number, {
+                '종목코드': order_dict['주식코드'],
+                '종목명': '',
+                '주문상태': '체결',
+                '주문구분': order_dict['구분'],
+                '주문수량': order_dict['수량'],
+                '체결가': order_dict['가격'],
+                '체결량': order_dict['수량'],
+                '미체결수량': 0,
+                '주문번호': order_number,
+            }),
+        ]
+
+def _message(type: str, key: str, value) -> dict:
+    return {'type': type, 'key': key, 'value': value}
+
+def tr_result(kwargs: dict, result, is_next: int = 0) -> dict:
+    """
+    TR 요청에 대한 응답 메시지를 만듭니다.
+    """
+    return _message('tr_result', kwargs['request_name'], [result, is_next])
+
+def price_info(price: int) -> dict:
+    return {'현재가': price, '시가': price, '고가': price, '저가': price}
+
+def price_change(stock_code: str, price: int) -> dict:
+    """
+    실시간 가격 정보 메시지를 만듭니다.
+    """
+    return _message('price_change', stock_code, price_info(price))
+
+def ask_bid_change(stock_code: str, price: int) -> dict:
+    """
+    실시간 호가 정보 메시지를 만듭니다.
+    """
+    return _message('ask_bid_change', stock_code, {
+        '매수호가정보': [[price - i, 100 + i] for i in range(10)],
+        '매도호가정보': [[price + i + 1, 100 + i] for i in range(10)],
+    })
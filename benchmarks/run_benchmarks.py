@@ -0,0 +1,259 @@
+"""
+easykiwoom 클라이언트의 주요 경로를 측정하는 벤치마크입니다.
+
+키움증권 프록시 대신 proxy_stub.ProxyStub을 띄워 오프라인에서 실행되며,
+결과는 JSON으로 출력되어 저장된 기준값(baseline)과 비교할 수 있습니다.
+
+    python benchmarks/run_benchmarks.py --output result.json
+    python benchmarks/run_benchmarks.py --baseline result.json --tolerance 0.2
+"""
+import argparse
+import json
+import logging
+import os
+import signal
+import statistics
+import subprocess
+import sys
+import time
+import timeit
+import tracemalloc
+import types
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import easykiwoom
+from easykiwoom import utils
+from easykiwoom.market import market as market_module
+from easykiwoom.market import market_utils
+from proxy_stub import ProxyStub, price_change, ask_bid_change
+
+# market_utils의 조회 / 주문 제한은 1초에 3번입니다.
+THEORETICAL_QUOTA_PER_SECOND = 3
+
+def _metric(value: float, unit: str, higher_is_better: bool, limit: float | None = None) -> dict:
+    # limit이 있는 항목은 기준값과 상관없이 limit을 넘으면 실패로 처리합니다.
+    metric = {'value': value, 'unit': unit, 'higher_is_better': higher_is_better}
+    if limit is not None:
+        metric['limit'] = limit
+    return metric
+
+def _percentiles(samples: list[float]) -> tuple[float, float, float]:
+    quantiles = statistics.quantiles(samples, n=100)
+    return quantiles[49], quantiles[89], quantiles[98]
+
+def _wait_until(condition, timeout: float = 60) -> None:
+    deadline = time.perf_counter() + timeout
+    while not condition():
+        if time.perf_counter() > deadline:
+            raise TimeoutError('벤치마크가 제한 시간 안에 끝나지 않았습니다.')
+        time.sleep(0.0005)
+
+def bench_import() -> dict:
+    code = 'import time; t = time.perf_counter(); import easykiwoom; print(time.perf_counter() - t)'
+    env = os.environ | {'PYTHONPATH': os.path.dirname(os.path.dirname(os.path.abspath(__file__)))}
+    samples = [
+        float(subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, env=env, check=True).stdout)
+        for _ in range(5)
+    ]
+    return {'import_time': _metric(min(samples) * 1000, 'ms', False)}
+
+def bench_initialize(market: easykiwoom.Market, stub: ProxyStub) -> dict:
+    # kiwoom_proxy.exe 대신 이미 떠 있는 stub에 연결합니다.
+    original_subprocess = market_module.subprocess
+    market_module.subprocess = types.SimpleNamespace(Popen=lambda *args, **kwargs: None)
+    stub.balance = {
+        f'{i:06}': {'종목코드': f'{i:06}', '종목명': '', '보유수량': 10, '주문가능수량': 10, '매입단가': 1000}
+        for i in range(50)
+    }
+    try:
+        start = time.perf_counter()
+        market.initialize()
+        elapsed = time.perf_counter() - start
+    finally:
+        market_module.subprocess = original_subprocess
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+    return {'initialize_time': _metric(elapsed * 1000, 'ms', False)}
+
+def bench_dispatch(market: easykiwoom.Market, stub: ProxyStub, message_num: int) -> dict:
+    messages = [price_change(f'{i % 2000:06}', 1000 + i % 100) for i in range(message_num - 1)]
+    messages.append(price_change('END', 0))
+    data = ''.join(json.dumps(message) + '\n' for message in messages).encode()
+    start = time.perf_counter()
+    stub.send_raw(data)
+    _wait_until(lambda: 'END' in market._price_info)
+    elapsed = time.perf_counter() - start
+    del market._price_info['END']
+    return {'dispatch_throughput': _metric(message_num / elapsed, 'messages/s', True)}
+
+def bench_tr_round_trip(market: easykiwoom.Market, sample_num: int) -> dict:
+    samples = []
+    for _ in range(sample_num):
+        # 제한에 걸려 기다리는 시간은 제외하고 클라이언트가 더하는 시간만 측정합니다.
+        market._request_counter.call_num = 0
+        start = time.perf_counter()
+        market.get_deposit()
+        samples.append((time.perf_counter() - start) * 1e6)
+    p50, p90, p99 = _percentiles(samples)
+    return {
+        'tr_round_trip_p50': _metric(p50, 'us', False),
+        'tr_round_trip_p99': _metric(p99, 'us', False),
+    }
+
+def bench_order_latency(market: easykiwoom.Market, sample_num: int) -> dict:
+    ack_samples, fill_samples = [], []
+    for i in range(sample_num):
+        market._order_counter.call_num = 0
+        order = {'구분': '매수', '주식코드': f'{i % 50:06}', '수량': 1, '가격': 1000, '시장가': False}
+        start = time.perf_counter()
+        order_number = market.send_order(order)
+        acked = time.perf_counter()
+        market.get_order_result(order_number)
+        filled = time.perf_counter()
+        ack_samples.append((acked - start) * 1e6)
+        fill_samples.append((filled - start) * 1e6)
+    metrics = {}
+    for name, samples in (('order_ack', ack_samples), ('order_fill', fill_samples)):
+        p50, p90, p99 = _percentiles(samples)
+        metrics[f'{name}_p50'] = _metric(p50, 'us', False)
+        metrics[f'{name}_p90'] = _metric(p90, 'us', False)
+        metrics[f'{name}_p99'] = _metric(p99, 'us', False)
+    return metrics
+
+def _measure_limiter(limited, market: easykiwoom.Market, duration: float) -> float:
+    def call() -> bool:
+        # 제한에 걸려 1초 기다린 호출이라면 True를 반환합니다.
+        start = time.perf_counter()
+        limited(market)
+        return time.perf_counter() - start > 0.5
+
+    # 처음 몇 번의 호출은 기다리지 않고 통과하므로, 제한에 걸려 기다린 직후부터
+    # 다시 기다린 직후까지의 온전한 구간만 측정해야 끝부분의 몰아치기로 값이 부풀려지지 않습니다.
+    while not call():
+        pass
+    start, call_num = time.perf_counter(), 1
+    while True:
+        is_waited = call()
+        if is_waited and time.perf_counter() - start >= duration:
+            return call_num / (time.perf_counter() - start)
+        call_num += 1
+
+def bench_rate_limiters(market: easykiwoom.Market, duration: float) -> dict:
+    metrics = {}
+    for name, decorator in (('request', market_utils.request_api_method), ('order', market_utils.order_api_method)):
+        achieved = _measure_limiter(decorator(lambda self: None), market, duration)
+        # 제한을 넘는 호출은 키움증권에서 실패하므로 1을 넘으면 안 되며, 1 이하에서는 높을수록 좋습니다.
+        metrics[f'{name}_limiter_utilization'] = _metric(achieved / THEORETICAL_QUOTA_PER_SECOND, 'ratio', True, limit=1.0)
+    return metrics
+
+def bench_memory_per_symbol(market: easykiwoom.Market, stub: ProxyStub, symbol_num: int) -> dict:
+    stock_codes = [f'M{i:05}' for i in range(symbol_num)]
+    messages = []
+    for stock_code in stock_codes:
+        messages.append(price_change(stock_code, 1000))
+        messages.append(ask_bid_change(stock_code, 1000))
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    stub.send(messages)
+    _wait_until(lambda: stock_codes[-1] in market._ask_bid_info)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    for stock_code in stock_codes:
+        del market._price_info[stock_code]
+        del market._ask_bid_info[stock_code]
+    return {'memory_per_symbol': _metric((after - before) / symbol_num, 'bytes', False)}
+
+def bench_get_balance(market: easykiwoom.Market) -> dict:
+    number, seconds = timeit.Timer(market.get_balance).autorange()
+    return {'get_balance': _metric(seconds / number * 1e6, 'us', False)}
+
+def bench_tick_functions() -> dict:
+    prices = list(range(1000, 600000, 997))
+    number, seconds = timeit.Timer(lambda: [utils.get_kiwoom_price(price) for price in prices]).autorange()
+    kiwoom_price = seconds / number / len(prices) * 1e9
+    number, seconds = timeit.Timer(lambda: [utils.get_shifted_kiwoom_price(price, 5) for price in prices]).autorange()
+    shifted_price = seconds / number / len(prices) * 1e9
+    return {
+        'get_kiwoom_price': _metric(kiwoom_price, 'ns', False),
+        'get_shifted_kiwoom_price': _metric(shifted_price, 'ns', False),
+    }
+
+def run(args: argparse.Namespace) -> dict:
+    results = {}
+    results |= bench_import()
+    results |= bench_tick_functions()
+
+    stub = ProxyStub(args.port)
+    market = easykiwoom.Market(args.port)
+    results |= bench_initialize(market, stub)
+    results |= bench_get_balance(market)
+    results |= bench_dispatch(market, stub, args.message_num)
+    results |= bench_tr_round_trip(market, args.sample_num)
+    results |= bench_order_latency(market, args.sample_num)
+    results |= bench_memory_per_symbol(market, stub, args.symbol_num)
+    results |= bench_rate_limiters(market, args.limiter_duration)
+    stub.close()
+    return results
+
+def check_limits(results: dict) -> list[str]:
+    """
+    limit을 넘은 항목들을 반환합니다.
+    """
+    violations = []
+    for name, metric in results.items():
+        if 'limit' in metric and metric['value'] > metric['limit']:
+            print(f'{name:>28}: {metric["value"]:.2f} {metric["unit"]}가 한도 {metric["limit"]:.2f}를 넘었습니다.', file=sys.stderr)
+            violations.append(name)
+    return violations
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """
+    결과를 기준값과 비교하여 tolerance 이상 나빠진 항목들을 반환합니다.
+    limit을 넘은 항목은 기준값보다 좋아 보이더라도 check_limits에서 실패로 처리됩니다.
+    """
+    regressions = []
+    for name, metric in results.items():
+        if name not in baseline or baseline[name]['value'] == 0:
+            continue
+        ratio = metric['value'] / baseline[name]['value']
+        change = ratio - 1 if metric['higher_is_better'] else 1 - ratio
+        print(f'{name:>28}: {baseline[name]["value"]:>14.2f} -> {metric["value"]:>14.2f} {metric["unit"]:<10} ({change:+.1%})',
+              file=sys.stderr)
+        if change < -tolerance:
+            regressions.append(name)
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description='easykiwoom 클라이언트 벤치마크')
+    parser.add_argument('--output', help='결과를 저장할 JSON 파일입니다. 없으면 표준출력으로 출력합니다.')
+    parser.add_argument('--baseline', help='비교할 기준 결과 JSON 파일입니다.')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='허용하는 성능 저하 비율입니다.')
+    parser.add_argument('--port', type=int, default=53939, help='stub 프록시가 사용할 포트입니다.')
+    parser.add_argument('--message-num', type=int, default=200000)
+    parser.add_argument('--sample-num', type=int, default=1000)
+    parser.add_argument('--symbol-num', type=int, default=2000)
+    parser.add_argument('--limiter-duration', type=float, default=3.0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)
+    results = run(args)
+
+    output = json.dumps(results, indent=4, ensure_ascii=False)
+    if args.output is None:
+        print(output)
+    else:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+
+    failures = check_limits(results)
+    if args.baseline is not None:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        failures += [name for name in compare(results, baseline, args.tolerance) if name not in failures]
+    if failures:
+        print(f'성능이 저하된 항목: {", ".join(failures)}', file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
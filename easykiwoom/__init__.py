@@ -1,2 +1,2 @@
-from .market import Market
-from . import utils
\ No newline at end of file
+from .market import Market, MarketPool, order_check, records
+from . import utils
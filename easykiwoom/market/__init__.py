@@ -1 +1,4 @@
-from .market import Market
\ No newline at end of file
+from .market import Market
+from .market_pool import MarketPool
+from . import order_check
+from . import records
@@ -0,0 +1,213 @@
+import os
+import json
+import threading
+import numpy as np
+
+_PRICE_KEYS = ('시가', '고가', '저가', '종가', '거래량')
+
+class CandleCache():
+    """
+    종목별 차트 데이터를 디스크에 저장하는 캐시 클래스
+
+    차트 데이터는 종목마다 하나의 .npz 파일에 열(column) 단위로 저장되며,
+    시간 순으로 정렬되어 있습니다.
+    여러 쓰레드가 동시에 메서드를 호출해도 안전합니다.
+    """
+
+    def __init__(self, cache_dir: str | None = None):
+        if cache_dir is None:
+            cache_dir = os.path.join(os.path.expanduser('~'), '.easykiwoom', 'candles')
+        self.cache_dir = cache_dir
+        self._lock = threading.Lock()
+
+    def _get_path(self, chart_name: str, stock_code: str) -> str:
+        return os.path.join(self.cache_dir, chart_name, f'{stock_code}.npz')
+
+    def load(self, chart_name: str, stock_code: str) -> tuple[dict[str, np.ndarray], bool, int]:
+        """
+        캐시된 차트 데이터를 읽어옵니다.
+
+        Parameters
+        ----------
+        chart_name : str
+            'daily', 'minute_1'과 같은 차트의 이름입니다.
+        stock_code : str
+            주식 코드입니다.
+
+        Returns
+        -------
+        tuple[dict[str, np.ndarray], bool, int]
+            열 단위의 차트 데이터, 상장일까지의 모든 데이터가 저장되어 있는지 여부,
+            그리고 저장 당시 이미 확정되어 있던 봉의 시간 상한(final_before)을 반환합니다.
+            final_before보다 이전 시간의 봉은 더 이상 바뀌지 않습니다.
+
+            columns = {
+                '시간': np.ndarray,
+                '시가': np.ndarray,
+                '고가': np.ndarray,
+                '저가': np.ndarray,
+                '종가': np.ndarray,
+                '거래량': np.ndarray,
+            }
+
+            '시간'은 일봉의 경우 YYYYMMDD, 분봉의 경우 YYYYMMDDHHMMSS 형식의 정수입니다.
+        """
+        path = self._get_path(chart_name, stock_code)
+        with self._lock:
+            if not os.path.exists(path):
+                return _empty_columns(), False, 0
+            with np.load(path) as data:
+                columns = {key: data[key] for key in ('시간',) + _PRICE_KEYS}
+                is_complete = bool(data['is_complete'])
+                final_before = int(data['final_before']) if 'final_before' in data else 0
+        return columns, is_complete, final_before
+
+    def save(self, chart_name: str, stock_code: str, columns: dict[str, np.ndarray],
+             is_complete: bool, final_before: int) -> None:
+        """
+        차트 데이터를 저장합니다.
+        파일을 먼저 임시로 쓴 뒤 교체하므로, 저장 도중 중단되더라도 기존 캐시는 손상되지 않습니다.
+
+        Parameters
+        ----------
+        chart_name : str
+            'daily', 'minute_1'과 같은 차트의 이름입니다.
+        stock_code : str
+            주식 코드입니다.
+        columns : dict[str, np.ndarray]
+            load 메서드가 반환하는 형식의 열 단위 차트 데이터입니다.
+        is_complete : bool
+            상장일까지의 모든 데이터가 저장되어 있는지 여부입니다.
+        final_before : int
+            이 시간보다 이전의 봉은 조회 당시 이미 확정되어 더 이상 바뀌지 않습니다.
+        """
+        path = self._get_path(chart_name, stock_code)
+        tmp_path = path + '.tmp.npz'
+        with self._lock:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            np.savez(tmp_path, is_complete=np.array(is_complete), final_before=np.array(final_before), **columns)
+            os.replace(tmp_path, path)
+
+    def load_progress(self, job_name: str) -> set[str]:
+        """
+        일괄 다운로드 작업에서 이미 완료된 주식 코드들을 읽어옵니다.
+
+        Parameters
+        ----------
+        job_name : str
+            일괄 다운로드 작업의 이름입니다.
+
+        Returns
+        -------
+        set[str]
+            완료된 주식 코드들의 집합입니다.
+        """
+        path = os.path.join(self.cache_dir, f'_progress_{job_name}.json')
+        with self._lock:
+            if not os.path.exists(path):
+                return set()
+            with open(path, encoding='utf-8') as f:
+                return set(json.load(f))
+
+    def save_progress(self, job_name: str, done_stock_codes: set[str] | None) -> None:
+        """
+        일괄 다운로드 작업의 진행 상황을 저장합니다.
+        done_stock_codes가 None이면 작업이 끝난 것으로 보고 진행 상황 파일을 지웁니다.
+
+        Parameters
+        ----------
+        job_name : str
+            일괄 다운로드 작업의 이름입니다.
+        done_stock_codes : set[str] | None
+            완료된 주식 코드들의 집합입니다.
+        """
+        path = os.path.join(self.cache_dir, f'_progress_{job_name}.json')
+        with self._lock:
+            if done_stock_codes is None:
+                if os.path.exists(path):
+                    os.remove(path)
+                return
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(sorted(done_stock_codes), f)
+
+def _empty_columns() -> dict[str, np.ndarray]:
+    return {key: np.empty(0, dtype=np.int64) for key in ('시간',) + _PRICE_KEYS}
+
+def candles_to_columns(candles: list[dict]) -> dict[str, np.ndarray]:
+    """
+    프록시로부터 받은 차트 데이터를 열 단위로 변환하고 시간 순으로 정렬합니다.
+
+    Parameters
+    ----------
+    candles : list[dict]
+        candle = {
+            '시간': str,
+            '시가': int,
+            '고가': int,
+            '저가': int,
+            '종가': int,
+            '거래량': int,
+        }
+
+    Returns
+    -------
+    dict[str, np.ndarray]
+        열 단위의 차트 데이터입니다.
+    """
+    if not candles:
+        return _empty_columns()
+    columns = {'시간': np.array([int(candle['시간']) for candle in candles], dtype=np.int64)}
+    for key in _PRICE_KEYS:
+        columns[key] = np.array([int(candle[key]) for candle in candles], dtype=np.int64)
+    order = np.argsort(columns['시간'], kind='stable')
+    return {key: value[order] for key, value in columns.items()}
+
+def merge_columns(old: dict[str, np.ndarray], new: dict[str, np.ndarray]) -> dict[str, np.ndarray]:
+    """
+    두 차트 데이터를 합칩니다.
+    같은 시간의 봉이 양쪽에 있다면 장중에 갱신되었을 수 있으므로 new의 값을 사용합니다.
+
+    Parameters
+    ----------
+    old : dict[str, np.ndarray]
+        기존의 열 단위 차트 데이터입니다.
+    new : dict[str, np.ndarray]
+        새로 받은 열 단위 차트 데이터입니다.
+
+    Returns
+    -------
+    dict[str, np.ndarray]
+        시간 순으로 정렬되고 중복이 제거된 차트 데이터입니다.
+    """
+    merged = {key: np.concatenate([new[key], old[key]]) for key in old}
+    # np.unique는 처음 등장한 index를 반환하므로 new가 우선됩니다.
+    _, index = np.unique(merged['시간'], return_index=True)
+    return {key: value[index] for key, value in merged.items()}
+
+def columns_to_candles(columns: dict[str, np.ndarray], start: int, end: int) -> list[dict]:
+    """
+    열 단위의 차트 데이터 중 [start, end] 구간을 봉의 리스트로 변환합니다.
+
+    Parameters
+    ----------
+    columns : dict[str, np.ndarray]
+        열 단위의 차트 데이터입니다.
+    start : int
+        구간의 시작 시간입니다.
+    end : int
+        구간의 끝 시간입니다.
+
+    Returns
+    -------
+    list[dict]
+        시간 순으로 정렬된 봉의 리스트입니다.
+    """
+    times = columns['시간']
+    lo = np.searchsorted(times, start, side='left')
+    hi = np.searchsorted(times, end, side='right')
+    sliced = {key: value[lo:hi].tolist() for key, value in columns.items()}
+    return [
+        {'시간': str(sliced['시간'][i])} | {key: sliced[key][i] for key in _PRICE_KEYS}
+        for i in range(hi - lo)
+    ]
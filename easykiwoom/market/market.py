@@ -1,4 +1,4 @@
-import copy
+import datetime
 import logging
 import os
 import sys
@@ -9,8 +9,13 @@ import socket
 import threading
 import psutil
 import signal
-from collections import defaultdict
+from collections import defaultdict, deque
+from typing import Callable
 from .market_utils import *
+from .candle_cache import CandleCache, candles_to_columns, merge_columns, columns_to_candles
+from .portfolio import Portfolio
+from .order_check import OrderChecker
+from .records import PriceInfo, AskBidInfo, OrderResult, BalanceEntry
 
 logger = logging.getLogger(__name__)
 
@@ -20,31 +25,65 @@ class Market():
     
     Client는 이 클래스의 메서드를 통해 주식과 계좌 정보를 얻고 이를 바탕으로 매매할 수 있습니다.
     여러 쓰레드가 동시에 메서드를 호출해도 안전합니다.
+
+    인스턴스는 프록시의 포트마다 하나씩만 존재하며, 각자 자신의 계좌와 API 호출 제한을 가집니다.
+    여러 계좌를 함께 사용하려면 MarketPool을 사용하는 것을 권합니다.
     """
 
-    _only_instance = None
-    def __new__(cls, *args, **kwargs):
-        if cls._only_instance is None:
-            cls._only_instance = super(Market, cls).__new__(cls, *args, **kwargs)
-        return cls._only_instance
+    default_port = 53939
+    # 차트 조회 결과를 기다릴 최대 시간(초)입니다.
+    _candle_request_timeout = 30
+    # 기본 포트가 아닌 프록시에 연결을 기다릴 최대 시간(초)입니다.
+    _connect_timeout = 60
+    _instances = {}
+    def __new__(cls, port: int = default_port):
+        if port not in cls._instances:
+            cls._instances[port] = super(Market, cls).__new__(cls)
+        return cls._instances[port]
     
-    def __init__(self):
+    def __init__(self, port: int = default_port):
+        """
+        Parameters
+        ----------
+        port : int, optional
+            키움증권 프록시가 사용할 포트입니다.
+            Default로 53939입니다.
+        """
+        self.port = port
+        self._request_counter = APICallCounter()
+        self._order_counter = APICallCounter()
         self._result_buffer = defaultdict(dict)
         self._result_buffer_lock = threading.Lock()
         self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         self._socket_buffer = ''
         self._socket_buffer_size = 8192
-        self._socket_lock = threading.Lock()
+        self._send_queue = deque()
+        self._order_send_queue = deque()
+        self._send_event = threading.Event()
+        self._send_batch_size = 65536
+        self._message_prefixes = {}
+        self._connection_error = None
         self._receiver_thread = threading.Thread(target=self._handle_proxy_responses, name='kiwoomproxy_receiver', daemon=True)
-        self._resetter_thread = threading.Thread(target=reset_API_call_count, name='API_call_count_resetter', daemon=True)
+        self._sender_thread = threading.Thread(target=self._handle_proxy_requests, name='kiwoomproxy_sender', daemon=True)
+        self._resetter_thread = threading.Thread(target=reset_API_call_count, args=(self._request_counter, self._order_counter),
+                                                 name='API_call_count_resetter', daemon=True)
 
         self._balance = None
         self._price_info = {}
         self._ask_bid_info = {}
+        self._candle_cache = CandleCache()
+        self._portfolio = Portfolio()
+        # 실시간 현재가를 받을 함수들입니다. MarketPool은 여기에 다른 계좌의 포트폴리오를 추가합니다.
+        self._price_listeners = [self._portfolio.update_price]
+        self._order_checker = OrderChecker(
+            get_balance=lambda stock_code: self._balance.get(stock_code),
+            get_last_price=lambda stock_code: self._price_info[stock_code].current_price if stock_code in self._price_info else None,
+        )
     
-    def _request_to_proxy(self, method: str, kwargs: dict) -> None:
+    def _request_to_proxy(self, method: str, kwargs: dict, is_order: bool = False) -> None:
         """
-        요청 정보를 키움증권 프록시에 전달합니다.
+        요청 정보를 전송 대기열에 넣습니다.
+        실제 전송은 sender 쓰레드가 대기열에 쌓인 요청들을 모아 한번에 처리합니다.
 
         Parameters
         ----------
@@ -52,10 +91,117 @@ class Market():
             프록시에서 실행시킬 함수 이름입니다.
         kwargs : dict
             프록시에서 실행시킬 함수의 인자입니다.
+        is_order : bool, optional
+            True일시 대기 중인 다른 요청들보다 먼저 전송됩니다.
+            Default로 False입니다.
+
+        Raises
+        ------
+        ConnectionError
+            프록시와의 연결이 이미 끊어졌을 때 발생합니다.
         """
-        data = (json.dumps({'method': method, 'kwargs': kwargs}) + '\n').encode()
-        with self._socket_lock:
-            self._socket.sendall(data)
+        if self._connection_error is not None:
+            raise self._connection_error
+        # json.dumps({'method': method, 'kwargs': kwargs})와 같은 결과를 kwargs만 직렬화하여 만듭니다.
+        prefix = self._message_prefixes.get(method)
+        if prefix is None:
+            prefix = ('{"method": ' + json.dumps(method) + ', "kwargs": ').encode()
+            self._message_prefixes[method] = prefix
+        data = prefix + json.dumps(kwargs).encode() + b'}\n'
+        # deque의 append는 thread-safe하므로 lock 없이 대기열에 넣습니다.
+        if is_order:
+            self._order_send_queue.append(data)
+        else:
+            self._send_queue.append(data)
+        self._send_event.set()
+
+    def _handle_proxy_requests(self):
+        """
+        전송 대기열에 쌓인 요청들을 모아 프록시에 전달합니다.
+        주문 요청을 먼저 보내며, 한번에 보내는 양을 제한하여 주문 요청이 오래 기다리지 않도록 합니다.
+        이 과정을 계속해서 반복합니다.
+        """
+        while True:
+            self._send_event.wait()
+            self._send_event.clear()
+            while self._order_send_queue or self._send_queue:
+                batch = []
+                while self._order_send_queue:
+                    batch.append(self._order_send_queue.popleft())
+                batch_size = 0
+                while self._send_queue and batch_size < self._send_batch_size:
+                    data = self._send_queue.popleft()
+                    batch.append(data)
+                    batch_size += len(data)
+                try:
+                    self._socket.sendall(b''.join(batch))
+                except OSError as e:
+                    logger.error('프록시에 요청을 전송하지 못했습니다.')
+                    self._fail_pending_requests(ConnectionError(f'프록시에 요청을 전송하지 못했습니다: {e}'))
+                    return
+
+    def _fail_pending_requests(self, error: ConnectionError) -> None:
+        """
+        프록시와의 연결이 끊어졌음을 기록하고, 결과를 기다리는 모든 요청을 깨워 error를 발생시키게 합니다.
+
+        Parameters
+        ----------
+        error : ConnectionError
+            기다리는 요청들에게 전달할 예외입니다.
+        """
+        self._connection_error = error
+        with self._result_buffer_lock:
+            result_queues = [result_queue for results in self._result_buffer.values() for result_queue in results.values()]
+        for result_queue in result_queues:
+            try:
+                result_queue.put(error, block=False)
+            except queue.Full:
+                pass
+
+    def _wait_for_result(self, result_queue: queue.Queue, timeout: float | None = None):
+        """
+        프록시로부터 결과가 올 때까지 기다린 뒤 반환합니다.
+
+        Parameters
+        ----------
+        result_queue : queue.Queue
+            결과가 들어올 queue입니다.
+        timeout : float | None, optional
+            결과를 기다릴 최대 시간(초)입니다.
+            Default로 None이며, 이 경우 결과가 올 때까지 계속 기다립니다.
+
+        Returns
+        -------
+        Any
+            프록시로부터 받은 결과입니다.
+
+        Raises
+        ------
+        ConnectionError
+            프록시와의 연결이 끊어졌을 때 발생합니다.
+        TimeoutError
+            timeout초 안에 결과가 오지 않았을 때 발생합니다.
+        """
+        if self._connection_error is not None and result_queue.empty():
+            raise self._connection_error
+        try:
+            result = result_queue.get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError(f'프록시가 {timeout}초 안에 응답하지 않았습니다.') from None
+        if isinstance(result, ConnectionError):
+            raise result
+        return result
+
+    def get_send_queue_size(self) -> int:
+        """
+        프록시로 아직 전송되지 않은 요청의 수를 반환합니다.
+
+        Returns
+        -------
+        int
+            전송 대기열에 있는 요청의 수입니다.
+        """
+        return len(self._order_send_queue) + len(self._send_queue)
     
     def _receive_from_proxy(self) -> dict:
         """
@@ -83,33 +229,56 @@ class Market():
         while True:
             try:
                 responses = self._receive_from_proxy()
-            except ConnectionError:
+            except (ConnectionError, OSError) as e:
+                self._fail_pending_requests(e if isinstance(e, ConnectionError) else ConnectionError(str(e)))
                 break
             for response in responses:
-                type, key, value = response['type'], response['key'], response['value']
-                if type == 'balance_change':
-                    balance_change = value
-                    if balance_change['보유수량'] == 0:
-                        del self._balance[balance_change['종목코드']]
-                    else:
-                        self._balance[balance_change['종목코드']] = balance_change
-                # 역전 현상 방지
-                elif type == 'order_result':
-                    order_number = key
-                    with self._result_buffer_lock:
-                        if order_number not in self._result_buffer[type]:
-                            self._result_buffer[type][order_number] = queue.Queue(maxsize=1)
-                    self._result_buffer[type][order_number].put(value, block=False)
-                elif type == 'price_change':
-                    self._price_info[key] = value
-                elif type == 'ask_bid_change':
-                    self._ask_bid_info[key] = value
-                else:
-                    self._result_buffer[type][key].put(value, block=False)
+                # 잘못된 응답 하나 때문에 이후의 모든 응답을 받지 못하는 일이 없도록 합니다.
+                try:
+                    self._dispatch_response(response)
+                except Exception:
+                    logger.exception(f'프록시의 응답을 처리하지 못했습니다: {response}')
+
+    def _dispatch_response(self, response: dict) -> None:
+        type, key, value = response['type'], response['key'], response['value']
+        # 자주 들어오는 실시간 정보는 dict 대신 가벼운 레코드로 변환하여 저장합니다.
+        if type == 'price_change':
+            price_info = PriceInfo.from_dict(value)
+            self._price_info[key] = price_info
+            if price_info.current_price is not None:
+                for listener in self._price_listeners:
+                    listener(key, price_info.current_price)
+        elif type == 'ask_bid_change':
+            self._ask_bid_info[key] = AskBidInfo.from_dict(value)
+        elif type == 'balance_change':
+            balance_change = BalanceEntry.from_dict(value)
+            if balance_change.quantity == 0:
+                self._balance.pop(balance_change.stock_code, None)
+            else:
+                self._balance[balance_change.stock_code] = balance_change
+            self._portfolio.update_position(balance_change.stock_code, balance_change.quantity or 0,
+                                            balance_change.purchase_price or 0)
+        # 역전 현상 방지
+        elif type == 'order_result':
+            order_number = key
+            order_result = OrderResult.from_dict(value)
+            with self._result_buffer_lock:
+                if order_number not in self._result_buffer[type]:
+                    self._result_buffer[type][order_number] = queue.Queue(maxsize=1)
+            self._result_buffer[type][order_number].put(order_result, block=False)
+            # 주문 검사용 기록에 실패하더라도 주문 결과는 전달되어야 하므로 결과를 먼저 넣습니다.
+            try:
+                self._order_checker.update_order(order_number, order_result)
+            except Exception:
+                logger.exception(f'{order_number} 주문의 체결 정보를 주문 검사에 반영하지 못했습니다.')
+        else:
+            self._result_buffer[type][key].put(value, block=False)
     
-    def _get_all_tr_results(self, method_name: str, kwargs: dict) -> list:
+    def _get_all_tr_results(self, method_name: str, kwargs: dict, stop_condition: Callable | None = None,
+                            timeout: float | None = None) -> list:
         """
         TR 요청을 연속조회한 값을 가져옵니다.
+        두번째 조회부터는 조회 요청 횟수에 포함됩니다.
 
         Parameters
         ----------
@@ -117,29 +286,46 @@ class Market():
             프록시에서 호출할 TR 요청 메서드입니다.
         kwargs : dict
             호출할 TR 요청 메서드의 인자입니다.
+        stop_condition : Callable | None, optional
+            각 조회 결과를 받아 True를 반환하면 연속조회를 멈춥니다.
+            Default로 None이며, 이 경우 끝까지 연속조회합니다.
+        timeout : float | None, optional
+            각 조회 결과를 기다릴 최대 시간(초)입니다.
+            Default로 None이며, 이 경우 결과가 올 때까지 계속 기다립니다.
 
         Returns
         -------
         list
             연속조회한 값이 순차적으로 담겨저 있는 리스트입니다.
+
+        Raises
+        ------
+        TimeoutError
+            timeout초 안에 조회 결과가 오지 않았을 때 발생합니다.
         """
         def _get_tr_result(method_name: str, kwargs: dict):
             request_name = get_unique_request_name()
             self._result_buffer['tr_result'][request_name] = queue.Queue(maxsize=1)
             kwargs['request_name'] = request_name
             self._request_to_proxy(method_name, kwargs)
-            tr_result, is_next = self._result_buffer['tr_result'][request_name].get()
-            del self._result_buffer['tr_result'][request_name]
+            try:
+                tr_result, is_next = self._wait_for_result(self._result_buffer['tr_result'][request_name], timeout)
+            finally:
+                del self._result_buffer['tr_result'][request_name]
             return tr_result, is_next
         tr_results = []
         is_next = 2
         while is_next == 2:
+            if tr_results:
+                count_continued_request(self._request_counter)
             tr_result, is_next = _get_tr_result(method_name, kwargs)
             tr_results.append(tr_result)
+            if stop_condition is not None and stop_condition(tr_result):
+                break
         return tr_results
 
     @trace
-    def initialize(self, logging_level: str = 'ERROR') -> None:
+    def initialize(self, logging_level: str = 'ERROR', candle_cache_dir: str | None = None) -> None:
         """
         키움증권 프록시와 연결하고 주식시장을 초기화합니다.
         (로그인 -> 계좌번호 로드 -> 초기 잔고 로드)
@@ -154,19 +340,42 @@ class Market():
             
             프로그램이 잘 동작하는지 확인하고 싶을 때는 'INFO'를 사용하고,
             일반적인 사용시에는 'ERROR'를 사용하는 것을 추천합니다.
+        candle_cache_dir : str | None, optional
+            차트 데이터를 저장할 디렉토리입니다.
+            Default로 None이며, 이 경우 ~/.easykiwoom/candles에 저장합니다.
+
+        Raises
+        ------
+        ConnectionError
+            프록시가 종료되었거나, 기본 포트가 아닌 포트의 프록시에 제한 시간 안에 연결하지 못했을 때 발생합니다.
         """
+        self._candle_cache = CandleCache(candle_cache_dir)
         exe_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'kiwoom_proxy.exe')
+        proxy_args = [exe_path, logging_level]
+        if self.port != self.default_port:
+            proxy_args.append(str(self.port))
         self.proxy = subprocess.Popen(
-            [exe_path, logging_level],
+            proxy_args,
             stdin=None,
             stdout=sys.stdout,
             stderr=sys.stderr
         )
+        # 포트 인자를 지원하지 않는 프록시는 기본 포트만 열기 때문에, 다른 포트라면 무한히 기다리지 않도록 합니다.
+        connect_deadline = None if self.port == self.default_port else time.monotonic() + self._connect_timeout
         while True:
             try:
-                self._socket.connect(('127.0.0.1', 53939))
+                self._socket.connect(('127.0.0.1', self.port))
                 break
             except ConnectionRefusedError:
+                if self.proxy is not None and self.proxy.poll() is not None:
+                    raise ConnectionError(f'키움증권 프록시가 종료되었습니다. (종료 코드: {self.proxy.returncode})') from None
+                if connect_deadline is not None and time.monotonic() > connect_deadline:
+                    if self.proxy is not None:
+                        self.proxy.terminate()
+                    raise ConnectionError(
+                        f'{self._connect_timeout}초 동안 {self.port} 포트의 키움증권 프록시에 연결하지 못했습니다. '
+                        f'기본 포트({self.default_port})가 아닌 포트를 지원하는 kiwoom_proxy.exe인지 확인해주세요.'
+                    ) from None
                 time.sleep(1)
 
         def signal_handler(sig, frame):
@@ -175,23 +384,33 @@ class Market():
         signal.signal(signal.SIGINT, signal_handler)
 
         self._receiver_thread.start()
+        self._sender_thread.start()
         self._resetter_thread.start()
 
         while True:
             self._result_buffer['login_result'][''] = queue.Queue(maxsize=1)
             self._request_to_proxy('login', {})
-            login_result = self._result_buffer['login_result'][''].get()
+            login_result = self._wait_for_result(self._result_buffer['login_result'][''])
             del self._result_buffer['login_result']['']
             if login_result == 0:
                 break
 
         self._request_to_proxy('load_account_number', {})
         
+        balance = self._load_balance()
+        balance = {stock_code: BalanceEntry.from_dict(stock_info) for stock_code, stock_info in balance.items()}
+        self._balance = balance
+        self._portfolio.reset(balance)
+
+    @request_api_method
+    @trace
+    def _load_balance(self) -> dict:
+        # 연속조회가 조회 요청 횟수에 포함되므로 request_api_method 안에서 조회합니다.
         tr_results = self._get_all_tr_results('get_balance', {})
         balance = {}
         for tr_result in tr_results:
             balance = balance | tr_result
-        self._balance = balance
+        return balance
 
     @trace
     def terminate(self) -> None:
@@ -222,7 +441,7 @@ class Market():
 
         self._result_buffer['condition_names'][''] = queue.Queue(maxsize=1)
         self._request_to_proxy('get_condition_names', {})
-        condition_list = self._result_buffer['condition_names'][''].get()
+        condition_list = self._wait_for_result(self._result_buffer['condition_names'][''])
         del self._result_buffer['condition_names']['']
         return condition_list
 
@@ -248,7 +467,7 @@ class Market():
         
         self._result_buffer['matching_stocks'][condition_name] = queue.Queue(maxsize=1)
         self._request_to_proxy('get_matching_stocks', {'condition_name': condition_name, 'condition_index': condition_index})
-        matching_stocks = self._result_buffer['matching_stocks'][condition_name].get()
+        matching_stocks = self._wait_for_result(self._result_buffer['matching_stocks'][condition_name])
         del self._result_buffer['matching_stocks'][condition_name]
         return matching_stocks
 
@@ -285,6 +504,7 @@ class Market():
             주문가능금액을 반환합니다.
         """
         tr_results = self._get_all_tr_results('get_deposit', {})
+        self._order_checker.set_cash(tr_results[0])
         return tr_results[0]
 
     @trace
@@ -304,15 +524,109 @@ class Market():
                 '매입단가': int,
             }
         """
-        return copy.deepcopy(self._balance)
+        # 내부의 BalanceEntry는 수정되지 않고 교체되기만 하므로 deepcopy 없이 새 dict로 변환합니다.
+        return {stock_code: balance_entry.to_dict() for stock_code, balance_entry in list(self._balance.items())}
+
+    def get_portfolio_summary(self) -> dict:
+        """
+        보유주식 전체의 평가 정보를 반환합니다.
+        실시간 가격 정보가 들어올 때마다 갱신되므로 자주 호출해도 부담이 없습니다.
+
+        보유주식의 실시간 가격 정보를 받으려면 register_price_info가 선행되어야 합니다.
+        실시간 가격 정보가 아직 없는 종목은 매입단가로 평가됩니다.
+
+        Returns
+        -------
+        dict
+            summary = {
+                '평가금액': int,
+                '매입금액': int,
+                '평가손익': int,
+                '수익률': float,
+            }
+        """
+        return self._portfolio.get_summary()
+
+    def get_position_info(self, stock_code: str) -> dict | None:
+        """
+        보유주식 하나의 평가 정보를 반환합니다.
+
+        Parameters
+        ----------
+        stock_code : str
+            평가 정보를 가져올 주식 코드입니다.
+
+        Returns
+        -------
+        dict | None
+            보유하지 않은 종목이면 None을 반환합니다.
+            position = {
+                '보유수량': int,
+                '매입단가': int,
+                '현재가': int,
+                '평가금액': int,
+                '평가손익': int,
+                '수익률': float,
+                '비중': float,
+            }
+
+            비중은 보유주식 전체의 평가금액 대비 이 종목의 평가금액입니다.
+        """
+        return self._portfolio.get_position(stock_code)
+
+    def add_portfolio_callback(self, callback: Callable, threshold: float,
+                               stock_code: str | None = None, is_below: bool = True) -> None:
+        """
+        수익률이 threshold를 넘어설 때 호출될 callback을 등록합니다.
+        예를 들어 threshold=-0.02로 등록하면 수익률이 -2% 이하로 떨어지는 순간 호출됩니다.
+
+        callback은 실시간 정보를 처리하는 쓰레드에서 호출되므로,
+        주문과 같이 오래 걸리는 작업은 다른 쓰레드에서 실행해야 합니다.
+
+        Parameters
+        ----------
+        callback : Callable
+            callback(stock_code, profit_rate) 형태로 호출됩니다.
+            포트폴리오 전체에 대한 callback이라면 stock_code는 None입니다.
+        threshold : float
+            기준 수익률입니다.
+        stock_code : str | None, optional
+            감시할 주식 코드입니다.
+            Default로 None이며, 이 경우 보유주식 전체의 수익률을 감시합니다.
+        is_below : bool, optional
+            True일시 수익률이 threshold 이하로 떨어질 때 호출됩니다.
+            False일시 수익률이 threshold 이상으로 올라갈 때 호출됩니다.
+            Default로 True입니다.
+        """
+        self._portfolio.add_callback(callback, threshold, stock_code, is_below)
     
-    @order_api_method
+    @trace
+    def add_order_check(self, check: Callable) -> None:
+        """
+        send_order가 주문을 전송하기 전에 실행할 검사를 추가합니다.
+        검사는 추가된 순서대로 실행되며, 하나라도 통과하지 못하면 주문은 전송되지 않습니다.
+
+        자주 쓰이는 검사는 easykiwoom.order_check에 구현되어 있습니다.
+        (TickSizeCheck, MaxNotionalCheck, PositionLimitCheck, CashCheck, ThrottleCheck, DuplicateCheck)
+
+        Parameters
+        ----------
+        check : Callable
+            check(order_dict, checker) 형태로 호출되어 통과한 order_dict를 반환합니다.
+            checker는 보유수량, 미체결 주문, 추정 주문가능금액 등을 제공하는 OrderChecker입니다.
+            주문을 거절하려면 OrderRejectedError를 발생시켜야 합니다.
+        """
+        self._order_checker.add_check(check)
+
     @trace
     def send_order(self, order_dict: dict) -> str:
         """
         주문을 전송합니다.
         시장가 주문을 전송할 경우 가격은 0으로 전달해야 합니다.
 
+        전송하기 전에 add_order_check로 추가된 검사를 실행합니다.
+        검사에서 거절된 주문은 주문 요청 횟수에 포함되지 않습니다.
+
         Parameters
         ----------
         order_dict : dict
@@ -328,11 +642,27 @@ class Market():
         -------
         str
             unique한 주문 번호를 반환합니다.
+
+        Raises
+        ------
+        OrderRejectedError
+            주문이 검사를 통과하지 못했을 때 발생합니다.
         """
+        order_dict, token = self._order_checker.run(order_dict)
+        order_number = None
+        try:
+            order_number = self._send_order(order_dict)
+        finally:
+            self._order_checker.register_order(token, order_number)
+        return order_number
+
+    @order_api_method
+    @trace
+    def _send_order(self, order_dict: dict) -> str:
         request_name = get_unique_request_name()
         self._result_buffer['tr_result'][request_name] = queue.Queue(maxsize=1)
-        self._request_to_proxy('send_order', {'order_dict': order_dict, 'request_name': request_name})
-        tr_results = self._result_buffer['tr_result'][request_name].get()
+        self._request_to_proxy('send_order', {'order_dict': order_dict, 'request_name': request_name}, is_order=True)
+        tr_results = self._wait_for_result(self._result_buffer['tr_result'][request_name])
         order_number = tr_results[0]
         del self._result_buffer['tr_result'][request_name]
         return order_number
@@ -357,15 +687,15 @@ class Market():
         """
         request_name = get_unique_request_name()
         self._result_buffer['tr_result'][request_name] = queue.Queue(maxsize=1)
-        self._request_to_proxy('cancel_order', {'order_dict': order_dict, 'request_name': request_name})
-        tr_results = self._result_buffer['tr_result'][request_name].get()
+        self._request_to_proxy('cancel_order', {'order_dict': order_dict, 'request_name': request_name}, is_order=True)
+        tr_results = self._wait_for_result(self._result_buffer['tr_result'][request_name])
         order_number = tr_results[0]
         del self._result_buffer['tr_result'][request_name]
         
         with self._result_buffer_lock:
             if order_number not in self._result_buffer['order_result']:
                 self._result_buffer['order_result'][order_number] = queue.Queue(maxsize=1)
-        _ = self._result_buffer['order_result'][order_number].get()
+        _ = self._wait_for_result(self._result_buffer['order_result'][order_number])
         
  
     @trace
@@ -399,10 +729,10 @@ class Market():
             if order_number not in self._result_buffer['order_result']:
                 self._result_buffer['order_result'][order_number] = queue.Queue(maxsize=1)
         while True:
-            order_result = self._result_buffer['order_result'][order_number].get()
-            if order_result['미체결수량'] == 0:
+            order_result = self._wait_for_result(self._result_buffer['order_result'][order_number])
+            if order_result.unexecuted_quantity == 0:
                 break
-        return order_result
+        return order_result.to_dict()
     
     @trace
     def register_price_info(self, stock_code_list: list[str], is_add: bool = False) -> None:
@@ -414,8 +744,8 @@ class Market():
         stock_code_list : list[str]
             실시간 정보를 등록하고 싶은 주식의 코드 리스트입니다.
         is_add : bool, optional
-            True일시 화면번호에 존재하는 기존의 등록은 사라집니다.
-            False일시 기존에 등록된 종목과 함께 실시간 정보를 받습니다.
+            True일시 기존에 등록된 종목과 함께 실시간 정보를 받습니다.
+            False일시 화면번호에 존재하는 기존의 등록은 사라집니다.
             Default로 False입니다.
         """
         self._request_to_proxy('register_price_info', {'stock_code_list': stock_code_list, 'is_add': is_add})
@@ -430,23 +760,23 @@ class Market():
         stock_code_list : list[str]
             실시간 정보를 등록하고 싶은 주식의 코드 리스트입니다.
         is_add : bool, optional
-            True일시 화면번호에 존재하는 기존의 등록은 사라집니다.
-            False일시 기존에 등록된 종목과 함께 실시간 정보를 받습니다.
+            True일시 기존에 등록된 종목과 함께 실시간 정보를 받습니다.
+            False일시 화면번호에 존재하는 기존의 등록은 사라집니다.
             Default로 False입니다.
         """
         self._request_to_proxy('register_ask_bid_info', {'stock_code_list': stock_code_list, 'is_add': is_add})
 
     @request_api_method
     @trace
-    def _get_price_info(self, stock_code: str) -> dict:
+    def _get_price_info(self, stock_code: str) -> PriceInfo:
         tr_results = self._get_all_tr_results('get_price_info', {'stock_code': stock_code})
-        return tr_results[0]
+        return PriceInfo.from_dict(tr_results[0])
     
     @request_api_method
     @trace
-    def _get_ask_bid_info(self, stock_code: str) -> dict:
+    def _get_ask_bid_info(self, stock_code: str) -> AskBidInfo:
         tr_results = self._get_all_tr_results('get_ask_bid_info', {'stock_code': stock_code})
-        return tr_results[0]
+        return AskBidInfo.from_dict(tr_results[0])
     
     @trace
     def get_price_info(self, stock_code: str, wait_time: int = 3) -> dict:
@@ -492,7 +822,7 @@ class Market():
         if cur_price_info is None:
             self._price_info[stock_code] = self._get_price_info(stock_code)
             cur_price_info = self._price_info[stock_code]
-        return cur_price_info
+        return cur_price_info.to_dict()
     
     @trace
     def get_ask_bid_info(self, stock_code: str, wait_time: int = 3) -> dict:
@@ -539,6 +869,225 @@ class Market():
         if cur_ask_bid_info is None:
             self._ask_bid_info[stock_code] = self._get_ask_bid_info(stock_code)
             cur_ask_bid_info = self._ask_bid_info[stock_code]
-        return cur_ask_bid_info
+        return cur_ask_bid_info.to_dict()
             
-    
\ No newline at end of file
+    
+    @request_api_method
+    @trace
+    def _get_candles(self, method_name: str, kwargs: dict, stop_time: int) -> tuple[list[dict], bool]:
+        # 차트 데이터는 최신 봉부터 내려오므로 stop_time 이전의 봉이 나오면 연속조회를 멈춥니다.
+        def is_enough(tr_result: list[dict]) -> bool:
+            return any(int(candle['시간']) <= stop_time for candle in tr_result)
+        # 차트 조회를 지원하지 않는 프록시는 응답하지 않으므로 무한히 기다리지 않도록 합니다.
+        try:
+            tr_results = self._get_all_tr_results(method_name, kwargs, stop_condition=is_enough,
+                                                  timeout=self._candle_request_timeout)
+        except TimeoutError:
+            raise TimeoutError(f'프록시가 {method_name} 요청에 {self._candle_request_timeout}초 동안 응답하지 않았습니다. '
+                               '차트 조회를 지원하는 키움증권 프록시인지 확인해주세요.') from None
+        candles = [candle for tr_result in tr_results for candle in tr_result]
+        is_complete = not is_enough(tr_results[-1])
+        return candles, is_complete
+
+    def _update_candles(self, chart_name: str, method_name: str, kwargs: dict,
+                        stock_code: str, start: int, end: int, final_before: int) -> dict:
+        """
+        캐시된 차트 데이터 중 [start, end] 구간에서 빠진 부분만 조회하여 채워넣습니다.
+
+        Parameters
+        ----------
+        chart_name : str
+            캐시에 저장될 차트의 이름입니다.
+        method_name : str
+            프록시에서 호출할 차트 조회 메서드입니다.
+        kwargs : dict
+            차트 조회 메서드의 인자입니다.
+        stock_code : str
+            주식 코드입니다.
+        start : int
+            구간의 시작 시간입니다.
+        end : int
+            구간의 끝 시간입니다.
+        final_before : int
+            지금 조회했을 때 이미 확정되어 있는 봉의 시간 상한입니다.
+            캐시를 저장할 당시의 final_before 이후의 봉은 그 뒤로 바뀌었거나 새로 생겼을 수 있으므로,
+            end가 그 이후라면 마지막 봉부터 다시 조회합니다.
+
+        Returns
+        -------
+        dict
+            갱신된 열 단위의 차트 데이터입니다.
+        """
+        columns, is_complete, cached_final_before = self._candle_cache.load(chart_name, stock_code)
+        times = columns['시간']
+        is_updated = False
+        if len(times) == 0:
+            candles, is_complete = self._get_candles(method_name, dict(kwargs), start)
+            columns = candles_to_columns(candles)
+            cached_final_before = final_before
+            is_updated = True
+        else:
+            # 저장 당시 확정되어 있던 구간만 요청했다면 새로 생기거나 바뀐 봉이 있을 수 없습니다.
+            if end >= cached_final_before:
+                candles, _ = self._get_candles(method_name, dict(kwargs), int(times[-1]))
+                columns = merge_columns(columns, candles_to_columns(candles))
+                cached_final_before = final_before
+                is_updated = True
+            if times[0] > start and not is_complete:
+                older_kwargs = dict(kwargs)
+                # 분봉 조회에는 기준일자가 없으므로 현재부터 캐시된 구간을 다시 거쳐 start까지 연속조회합니다.
+                if 'base_date' in older_kwargs:
+                    older_kwargs['base_date'] = str(times[0])[:8]
+                candles, is_complete = self._get_candles(method_name, older_kwargs, start)
+                columns = merge_columns(columns, candles_to_columns(candles))
+                is_updated = True
+        if is_updated:
+            self._candle_cache.save(chart_name, stock_code, columns, is_complete, cached_final_before)
+        return columns
+
+    @trace
+    def get_daily_candles(self, stock_code: str, start_date: str, end_date: str | None = None) -> list[dict]:
+        """
+        주어진 주식 코드의 일봉 데이터를 가져옵니다.
+
+        조회한 데이터는 디스크에 저장되며, 이후의 호출에서는 저장되지 않은 구간만 조회합니다.
+        다만 조회가 필요한 경우 연속조회한 횟수만큼 API 조회 요청 횟수에 포함됩니다.
+
+        Parameters
+        ----------
+        stock_code : str
+            일봉 데이터를 가져올 주식 코드입니다.
+        start_date : str
+            YYYYMMDD 형식의 시작 일자입니다.
+        end_date : str | None, optional
+            YYYYMMDD 형식의 끝 일자입니다.
+            Default로 None이며, 이 경우 오늘까지의 데이터를 가져옵니다.
+
+        Returns
+        -------
+        list[dict]
+            일자 순으로 정렬된 일봉의 리스트입니다.
+            candle = {
+                '시간': str,
+                '시가': int,
+                '고가': int,
+                '저가': int,
+                '종가': int,
+                '거래량': int,
+            }
+
+            '시간'은 YYYYMMDD 형식입니다.
+
+        Raises
+        ------
+        TimeoutError
+            프록시가 차트 조회에 응답하지 않을 때 발생합니다. 차트 조회를 지원하지 않는 프록시일 수 있습니다.
+        """
+        today = datetime.datetime.now().strftime('%Y%m%d')
+        end_date = today if end_date is None else end_date
+        kwargs = {'stock_code': stock_code, 'base_date': today}
+        # 오늘의 일봉은 장중에 바뀔 수 있으므로 어제까지의 일봉만 확정된 것으로 봅니다.
+        columns = self._update_candles('daily', 'get_daily_candles', kwargs,
+                                       stock_code, int(start_date), int(end_date), int(today))
+        return columns_to_candles(columns, int(start_date), int(end_date))
+
+    @trace
+    def get_minute_candles(self, stock_code: str, start_time: str, end_time: str | None = None,
+                           tick_range: int = 1) -> list[dict]:
+        """
+        주어진 주식 코드의 분봉 데이터를 가져옵니다.
+
+        조회한 데이터는 디스크에 저장되며, 이후의 호출에서는 저장된 마지막 분봉 이후의 구간만 조회합니다.
+        다만 분봉 조회에는 기준일자를 지정할 수 없으므로, 저장된 구간보다 과거의 데이터를 요청하면
+        현재부터 이미 저장된 구간을 다시 거쳐 start_time까지 연속조회합니다.
+        조회가 필요한 경우 연속조회한 횟수만큼 API 조회 요청 횟수에 포함됩니다.
+
+        Parameters
+        ----------
+        stock_code : str
+            분봉 데이터를 가져올 주식 코드입니다.
+        start_time : str
+            YYYYMMDDHHMMSS 형식의 시작 시간입니다.
+        end_time : str | None, optional
+            YYYYMMDDHHMMSS 형식의 끝 시간입니다.
+            Default로 None이며, 이 경우 현재까지의 데이터를 가져옵니다.
+        tick_range : int, optional
+            분봉의 단위입니다.
+            1, 3, 5, 10, 15, 30, 45, 60 중 하나를 선택할 수 있습니다.
+            Default로 1입니다.
+
+        Returns
+        -------
+        list[dict]
+            시간 순으로 정렬된 분봉의 리스트입니다.
+            candle = {
+                '시간': str,
+                '시가': int,
+                '고가': int,
+                '저가': int,
+                '종가': int,
+                '거래량': int,
+            }
+
+            '시간'은 YYYYMMDDHHMMSS 형식입니다.
+
+        Raises
+        ------
+        TimeoutError
+            프록시가 차트 조회에 응답하지 않을 때 발생합니다. 차트 조회를 지원하지 않는 프록시일 수 있습니다.
+        """
+        now = datetime.datetime.now()
+        end_time = now.strftime('%Y%m%d%H%M%S') if end_time is None else end_time
+        # 아직 끝나지 않은 분봉은 tick_range분 이내에 시작한 봉이므로 그 이전의 봉만 확정된 것으로 봅니다.
+        final_before = int((now - datetime.timedelta(minutes=tick_range)).strftime('%Y%m%d%H%M%S'))
+        kwargs = {'stock_code': stock_code, 'tick_range': tick_range}
+        columns = self._update_candles(f'minute_{tick_range}', 'get_minute_candles', kwargs,
+                                       stock_code, int(start_time), int(end_time), final_before)
+        return columns_to_candles(columns, int(start_time), int(end_time))
+
+    @staticmethod
+    def _get_candle_job_name(start: str, end: str | None, tick_range: int | None) -> str:
+        # 같은 날 같은 인자로 호출된 일괄 다운로드는 같은 작업으로 취급합니다.
+        chart_name = 'daily' if tick_range is None else f'minute_{tick_range}'
+        today = datetime.datetime.now().strftime('%Y%m%d')
+        return f'{chart_name}_{start}_{end}_{today}'
+
+    def _download_candle(self, stock_code: str, start: str, end: str | None, tick_range: int | None) -> None:
+        if tick_range is None:
+            self.get_daily_candles(stock_code, start, end)
+        else:
+            self.get_minute_candles(stock_code, start, end, tick_range)
+
+    @trace
+    def download_candles(self, stock_code_list: list[str], start: str, end: str | None = None,
+                         tick_range: int | None = None) -> None:
+        """
+        여러 주식의 차트 데이터를 한꺼번에 조회하여 디스크에 저장합니다.
+
+        조회는 API 조회 요청 제한에 맞춰 순차적으로 진행됩니다.
+        진행 상황이 저장되므로, 도중에 중단되더라도 같은 날 같은 인자로 다시 호출하면
+        이미 완료된 주식은 건너뛰고 이어서 진행합니다.
+
+        Parameters
+        ----------
+        stock_code_list : list[str]
+            차트 데이터를 저장할 주식 코드 리스트입니다.
+        start : str
+            시작 시간입니다. 일봉의 경우 YYYYMMDD, 분봉의 경우 YYYYMMDDHHMMSS 형식입니다.
+        end : str | None, optional
+            끝 시간입니다. 형식은 start와 같습니다.
+            Default로 None이며, 이 경우 현재까지의 데이터를 저장합니다.
+        tick_range : int | None, optional
+            분봉의 단위입니다.
+            Default로 None이며, 이 경우 일봉 데이터를 저장합니다.
+        """
+        job_name = self._get_candle_job_name(start, end, tick_range)
+        done_stock_codes = self._candle_cache.load_progress(job_name)
+        for stock_code in stock_code_list:
+            if stock_code in done_stock_codes:
+                continue
+            self._download_candle(stock_code, start, end, tick_range)
+            done_stock_codes.add(stock_code)
+            self._candle_cache.save_progress(job_name, done_stock_codes)
+            logger.info(f'{stock_code} 차트 데이터 저장 완료 ({len(done_stock_codes)}/{len(stock_code_list)})')
+        self._candle_cache.save_progress(job_name, None)
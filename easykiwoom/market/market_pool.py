@@ -0,0 +1,423 @@
+import logging
+import queue
+import signal
+import threading
+import time
+from .market_utils import trace
+from .market import Market
+from .candle_cache import CandleCache
+from .order_check import OrderRejectedError
+
+logger = logging.getLogger(__name__)
+
+class MarketPool():
+    """
+    여러 계좌(프록시)를 묶어 하나의 주식시장처럼 사용하게 해주는 클래스
+
+    각 계좌는 서로 다른 포트의 프록시와 연결된 Market이며, 조회 / 주문 제한을 따로 가집니다.
+    조회 요청은 남은 조회 횟수가 가장 많은 계좌로 보내고,
+    주문은 해당 주식을 보유한 계좌로 보내며,
+    실시간 정보는 종목마다 한 계좌에만 등록하여 중복 등록을 피하되,
+    받은 정보는 모든 계좌가 공유하여 각 계좌의 포트폴리오와 주문 검사에 반영됩니다.
+    여러 쓰레드가 동시에 메서드를 호출해도 안전합니다.
+    """
+
+    def __init__(self, port_list: list[int]):
+        """
+        Parameters
+        ----------
+        port_list : list[int]
+            각 프록시가 사용할 포트 리스트입니다.
+            기본 포트(53939)가 아닌 포트는 실행 인자로 포트를 받는 kiwoom_proxy.exe가 있어야 사용할 수 있습니다.
+            첫번째 포트의 계좌는 보유하지 않은 주식을 매수할 때 사용되는 기본 계좌입니다.
+        """
+        if not port_list:
+            raise ValueError('적어도 하나의 포트가 필요합니다.')
+        self.markets = [Market(port) for port in port_list]
+        self._markets_by_port = {market.port: market for market in self.markets}
+        # 주문 번호는 계좌마다 따로 매겨지므로 (port, 주문 번호)로 구분합니다.
+        self._order_markets = {}
+        self._order_lock = threading.Lock()
+        # 조건검색식은 계좌(로그인)마다 따로 로드되므로 이름을 로드한 계좌에서만 조건검색을 합니다.
+        self._condition_market = None
+        self._price_subscribers = {}
+        self._ask_bid_subscribers = {}
+        self._subscription_lock = threading.Lock()
+
+        # 실시간 정보는 한 계좌로만 들어오므로 모든 계좌가 같은 정보를 보도록 합니다.
+        price_info, ask_bid_info = {}, {}
+        for market in self.markets:
+            market._price_info = price_info
+            market._ask_bid_info = ask_bid_info
+            market._price_listeners.extend(
+                other_market._portfolio.update_price for other_market in self.markets if other_market is not market
+            )
+
+    @trace
+    def initialize(self, logging_level: str = 'ERROR', candle_cache_dir: str | None = None) -> None:
+        """
+        모든 프록시와 연결하고 주식시장을 초기화합니다.
+        다른 메서드를 사용하기 전에 오직 한번만 호출되어야 합니다.
+
+        Parameters
+        ----------
+        logging_level : str, optional
+            로깅 레벨을 설정합니다.
+            'DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL' 중 하나를 선택할 수 있습니다.
+        candle_cache_dir : str | None, optional
+            차트 데이터를 저장할 디렉토리입니다. 모든 계좌가 같은 캐시를 공유합니다.
+            Default로 None이며, 이 경우 ~/.easykiwoom/candles에 저장합니다.
+        """
+        candle_cache = CandleCache(candle_cache_dir)
+        for market in self.markets:
+            market.initialize(logging_level, candle_cache_dir)
+            market._candle_cache = candle_cache
+
+        # 각 Market이 등록한 handler를 모든 프록시를 종료하는 handler로 덮어씁니다.
+        def signal_handler(sig, frame):
+            self.terminate()
+            raise KeyboardInterrupt
+        signal.signal(signal.SIGINT, signal_handler)
+
+    @trace
+    def terminate(self) -> None:
+        """
+        모든 키움증권 프록시를 종료합니다.
+        """
+        for market in self.markets:
+            market.terminate()
+
+    def _get_spare_market(self) -> Market:
+        # 다른 조회를 진행 중이지 않고 남은 조회 횟수가 가장 많은 계좌를 고릅니다.
+        return max(self.markets, key=lambda market: (
+            not market._request_counter.lock.locked(),
+            market._request_counter.get_spare_call_num(),
+        ))
+
+    def _get_order_market(self, order_dict: dict, port: int | None) -> Market:
+        if port is not None:
+            return self._markets_by_port[port]
+        stock_code = order_dict['주식코드']
+        holding_markets = [market for market in self.markets if stock_code in market._balance]
+        if order_dict['구분'] == '매도':
+            for market in holding_markets:
+                if market._balance[stock_code]['주문가능수량'] >= order_dict['수량']:
+                    return market
+            raise OrderRejectedError(f'{stock_code}를 {order_dict["수량"]}주 이상 매도할 수 있는 계좌가 없습니다.')
+        return holding_markets[0] if holding_markets else self.markets[0]
+
+    def _find_order_market(self, order_number: str, port: int | None) -> Market:
+        with self._order_lock:
+            ports = [order_port for order_port, order_key in self._order_markets if order_key == order_number]
+        if port is not None:
+            if port not in ports:
+                raise KeyError(f'{port} 포트의 계좌로 전송된 {order_number} 주문이 없습니다.')
+        elif len(ports) == 1:
+            port = ports[0]
+        elif not ports:
+            raise KeyError(f'{order_number} 주문이 없습니다.')
+        else:
+            raise ValueError(f'{order_number} 주문 번호를 가진 계좌가 여러개입니다. port를 지정해주세요.')
+        return self._markets_by_port[port]
+
+    @trace
+    def get_condition_names(self) -> list[dict]:
+        """
+        조건검색식을 로드하고 각각의 이름과 인덱스를 반환합니다.
+        조건검색식을 로드한 계좌는 이후의 get_matching_stocks에 계속 사용됩니다.
+        자세한 내용은 Market.get_condition_names를 참고해주세요.
+        """
+        market = self._get_spare_market()
+        condition_list = market.get_condition_names()
+        self._condition_market = market
+        return condition_list
+
+    @trace
+    def get_matching_stocks(self, condition_name: str, condition_index: int) -> list[str]:
+        """
+        주어진 조건검색식과 부합하는 주식 코드의 리스트를 반환합니다.
+        조건검색식의 인덱스는 계좌마다 다를 수 있으므로 get_condition_names로 조건검색식을 로드한 계좌를 사용합니다.
+        자세한 내용은 Market.get_matching_stocks를 참고해주세요.
+
+        Raises
+        ------
+        RuntimeError
+            get_condition_names가 한번도 호출되지 않았을 때 발생합니다.
+        """
+        market = self._condition_market
+        if market is None:
+            raise RuntimeError('조건검색식이 로드되지 않았습니다. get_condition_names를 먼저 호출해주세요.')
+        return market.get_matching_stocks(condition_name, condition_index)
+
+    @trace
+    def get_stocks_with_volume_spike(self, criterion: str) -> list[str]:
+        """
+        거래량이 급증한 주식들을 가져옵니다.
+        자세한 내용은 Market.get_stocks_with_volume_spike를 참고해주세요.
+        """
+        return self._get_spare_market().get_stocks_with_volume_spike(criterion)
+
+    @trace
+    def get_daily_candles(self, stock_code: str, start_date: str, end_date: str | None = None) -> list[dict]:
+        """
+        주어진 주식 코드의 일봉 데이터를 가져옵니다.
+        자세한 내용은 Market.get_daily_candles를 참고해주세요.
+        """
+        return self._get_spare_market().get_daily_candles(stock_code, start_date, end_date)
+
+    @trace
+    def get_minute_candles(self, stock_code: str, start_time: str, end_time: str | None = None,
+                           tick_range: int = 1) -> list[dict]:
+        """
+        주어진 주식 코드의 분봉 데이터를 가져옵니다.
+        자세한 내용은 Market.get_minute_candles를 참고해주세요.
+        """
+        return self._get_spare_market().get_minute_candles(stock_code, start_time, end_time, tick_range)
+
+    @trace
+    def download_candles(self, stock_code_list: list[str], start: str, end: str | None = None,
+                         tick_range: int | None = None) -> None:
+        """
+        여러 주식의 차트 데이터를 모든 계좌에 나누어 조회하고 디스크에 저장합니다.
+        계좌마다 하나의 쓰레드가 남은 주식을 하나씩 가져가 조회하므로 계좌 수에 비례하여 빨라집니다.
+        자세한 내용은 Market.download_candles를 참고해주세요.
+        """
+        candle_cache = self.markets[0]._candle_cache
+        job_name = Market._get_candle_job_name(start, end, tick_range)
+        done_stock_codes = candle_cache.load_progress(job_name)
+        progress_lock = threading.Lock()
+        remaining = queue.Queue()
+        for stock_code in stock_code_list:
+            if stock_code not in done_stock_codes:
+                remaining.put(stock_code)
+        errors = []
+
+        def download(market: Market):
+            while not errors:
+                try:
+                    stock_code = remaining.get(block=False)
+                except queue.Empty:
+                    return
+                try:
+                    market._download_candle(stock_code, start, end, tick_range)
+                except Exception as e:
+                    errors.append(e)
+                    return
+                with progress_lock:
+                    done_stock_codes.add(stock_code)
+                    candle_cache.save_progress(job_name, done_stock_codes)
+                logger.info(f'{stock_code} 차트 데이터 저장 완료 ({len(done_stock_codes)}/{len(stock_code_list)})')
+
+        threads = [
+            threading.Thread(target=download, args=(market,), name=f'candle_downloader_{market.port}', daemon=True)
+            for market in self.markets
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if errors:
+            raise errors[0]
+        candle_cache.save_progress(job_name, None)
+
+    @trace
+    def get_deposit(self) -> dict[int, int]:
+        """
+        계좌별 주문가능금액을 반환합니다.
+
+        Returns
+        -------
+        dict[int, int]
+            dict[port] = 주문가능금액
+        """
+        return {market.port: market.get_deposit() for market in self.markets}
+
+    @trace
+    def get_balance(self) -> dict[int, dict]:
+        """
+        계좌별 보유주식정보를 반환합니다.
+
+        Returns
+        -------
+        dict[int, dict]
+            dict[port] = Market.get_balance가 반환하는 보유주식정보
+        """
+        return {market.port: market.get_balance() for market in self.markets}
+
+    def get_portfolio_summary(self) -> dict:
+        """
+        모든 계좌의 보유주식 전체에 대한 평가 정보를 반환합니다.
+        자세한 내용은 Market.get_portfolio_summary를 참고해주세요.
+        """
+        total_value, total_cost = 0, 0
+        for market in self.markets:
+            summary = market.get_portfolio_summary()
+            total_value += summary['평가금액']
+            total_cost += summary['매입금액']
+        return {
+            '평가금액': total_value,
+            '매입금액': total_cost,
+            '평가손익': total_value - total_cost,
+            '수익률': (total_value - total_cost) / total_cost if total_cost != 0 else 0.0,
+        }
+
+    @trace
+    def add_order_check(self, check) -> None:
+        """
+        모든 계좌의 send_order에 주문 전 검사를 추가합니다.
+        자세한 내용은 Market.add_order_check를 참고해주세요.
+        """
+        for market in self.markets:
+            market.add_order_check(check)
+
+    @trace
+    def send_order(self, order_dict: dict, port: int | None = None) -> str:
+        """
+        주문을 전송합니다.
+
+        매도 주문은 해당 주식을 충분히 보유한 계좌로 전송됩니다.
+        매수 주문은 해당 주식을 이미 보유한 계좌로, 보유한 계좌가 없다면 기본 계좌로 전송됩니다.
+        자세한 내용은 Market.send_order를 참고해주세요.
+
+        Parameters
+        ----------
+        order_dict : dict
+            Market.send_order와 같은 형식의 주문입니다.
+        port : int | None, optional
+            주문을 전송할 계좌의 포트입니다.
+            Default로 None이며, 이 경우 위의 규칙에 따라 계좌를 고릅니다.
+
+        Returns
+        -------
+        str
+            주문 번호를 반환합니다.
+            주문 번호는 계좌마다 따로 매겨지므로, 여러 계좌에서 같은 주문 번호가 나오면
+            cancel_order와 get_order_result에 port를 함께 전달해야 합니다.
+
+        Raises
+        ------
+        OrderRejectedError
+            매도할 수 있는 계좌가 없거나 주문이 검사를 통과하지 못했을 때 발생합니다.
+        """
+        market = self._get_order_market(order_dict, port)
+        order_number = market.send_order(order_dict)
+        with self._order_lock:
+            self._order_markets[(market.port, order_number)] = market
+        return order_number
+
+    @trace
+    def cancel_order(self, order_dict: dict, port: int | None = None) -> None:
+        """
+        지정가 주문을 취소합니다. 원주문을 전송한 계좌로 취소 주문이 전송됩니다.
+        전량 취소한 원주문은 더 이상 추적하지 않으므로 get_order_result로 조회할 수 없습니다.
+        자세한 내용은 Market.cancel_order를 참고해주세요.
+
+        Parameters
+        ----------
+        order_dict : dict
+            Market.cancel_order와 같은 형식의 취소 주문입니다.
+        port : int | None, optional
+            원주문을 전송한 계좌의 포트입니다.
+            Default로 None이며, 이 경우 원주문번호로 계좌를 찾습니다.
+        """
+        market = self._find_order_market(order_dict['원주문번호'], port)
+        market.cancel_order(order_dict)
+        if order_dict['수량'] == 0:
+            with self._order_lock:
+                self._order_markets.pop((market.port, order_dict['원주문번호']), None)
+
+    @trace
+    def get_order_result(self, order_number: str, port: int | None = None) -> dict:
+        """
+        주문 번호을 가지고 주문 정보를 얻어옵니다.
+        주문이 전부 체결되어 정보를 반환한 뒤에는 더 이상 추적하지 않습니다.
+        자세한 내용은 Market.get_order_result를 참고해주세요.
+
+        Parameters
+        ----------
+        order_number : str
+            send_order 함수로 얻은 주문 번호입니다.
+        port : int | None, optional
+            주문을 전송한 계좌의 포트입니다.
+            Default로 None이며, 이 경우 주문 번호로 계좌를 찾습니다.
+        """
+        market = self._find_order_market(order_number, port)
+        order_result = market.get_order_result(order_number)
+        with self._order_lock:
+            self._order_markets.pop((market.port, order_number), None)
+        return order_result
+
+    def _register(self, stock_code_list: list[str], subscribers: dict, register_name: str) -> None:
+        with self._subscription_lock:
+            new_registrations = {}
+            for stock_code in stock_code_list:
+                if stock_code in subscribers:
+                    continue
+                # 등록된 종목이 가장 적은 계좌에 등록합니다.
+                counts = {market.port: 0 for market in self.markets}
+                for market in subscribers.values():
+                    counts[market.port] += 1
+                market = self._markets_by_port[min(counts, key=counts.get)]
+                subscribers[stock_code] = market
+                new_registrations.setdefault(market.port, []).append(stock_code)
+        for port, new_stock_codes in new_registrations.items():
+            getattr(self._markets_by_port[port], register_name)(new_stock_codes, is_add=True)
+
+    @trace
+    def register_price_info(self, stock_code_list: list[str]) -> None:
+        """
+        주어진 주식 코드에 대한 실시간 가격 정보를 등록합니다.
+        이미 어느 계좌에든 등록된 종목은 다시 등록하지 않으며, 새 종목은 등록된 종목이 가장 적은 계좌에 추가됩니다.
+
+        Parameters
+        ----------
+        stock_code_list : list[str]
+            실시간 정보를 등록하고 싶은 주식의 코드 리스트입니다.
+        """
+        self._register(stock_code_list, self._price_subscribers, 'register_price_info')
+
+    @trace
+    def register_ask_bid_info(self, stock_code_list: list[str]) -> None:
+        """
+        주어진 주식 코드에 대한 실시간 호가 정보를 등록합니다.
+        이미 어느 계좌에든 등록된 종목은 다시 등록하지 않으며, 새 종목은 등록된 종목이 가장 적은 계좌에 추가됩니다.
+
+        Parameters
+        ----------
+        stock_code_list : list[str]
+            실시간 정보를 등록하고 싶은 주식의 코드 리스트입니다.
+        """
+        self._register(stock_code_list, self._ask_bid_subscribers, 'register_ask_bid_info')
+
+    def _get_real_time_info(self, stock_code: str, wait_time: int, info_name: str, request_name: str) -> dict:
+        # 실시간 정보는 모든 계좌가 공유하므로 어느 계좌의 것을 읽어도 됩니다.
+        info_dict = getattr(self.markets[0], info_name)
+        while True:
+            try:
+                return info_dict[stock_code].to_dict()
+            except KeyError:
+                if wait_time <= 0:
+                    break
+                time.sleep(1)
+                wait_time -= 1
+        # 직접적인 정보 요청은 등록한 계좌가 아닌 조회 여유가 있는 계좌로 보냅니다.
+        info_dict[stock_code] = getattr(self._get_spare_market(), request_name)(stock_code)
+        return info_dict[stock_code].to_dict()
+
+    @trace
+    def get_price_info(self, stock_code: str, wait_time: int = 3):
+        """
+        주어진 주식 코드에 대한 실시간 가격 정보를 가져옵니다.
+        정보가 들어오지 않아 직접적인 정보 요청을 할 경우 조회 여유가 있는 계좌를 사용합니다.
+        자세한 내용은 Market.get_price_info를 참고해주세요.
+        """
+        return self._get_real_time_info(stock_code, wait_time, '_price_info', '_get_price_info')
+
+    @trace
+    def get_ask_bid_info(self, stock_code: str, wait_time: int = 3):
+        """
+        주어진 주식 코드에 대한 실시간 호가 정보를 가져옵니다.
+        정보가 들어오지 않아 직접적인 정보 요청을 할 경우 조회 여유가 있는 계좌를 사용합니다.
+        자세한 내용은 Market.get_ask_bid_info를 참고해주세요.
+        """
+        return self._get_real_time_info(stock_code, wait_time, '_ask_bid_info', '_get_ask_bid_info')
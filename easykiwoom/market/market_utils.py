@@ -47,12 +47,34 @@ def trace(func: Callable) -> Callable:
         return result
     return wrapper
 
-_request_api_num_per_second = 0
-_request_api_lock = threading.Lock()
+class APICallCounter():
+    """
+    1초 동안의 API 호출 횟수를 세는 클래스
+    
+    Market 인스턴스마다 조회용, 주문용으로 하나씩 가지므로 계좌(프록시)마다 제한이 따로 계산됩니다.
+    """
+
+    def __init__(self, max_call_num: int = 3):
+        self.max_call_num = max_call_num
+        self.call_num = 0
+        self.lock = threading.Lock()
+
+    def get_spare_call_num(self) -> int:
+        """
+        이번 1초 동안 기다리지 않고 더 호출할 수 있는 횟수를 반환합니다.
+
+        Returns
+        -------
+        int
+            남은 호출 가능 횟수입니다.
+        """
+        return max(self.max_call_num - self.call_num, 0)
+
 def request_api_method(func: Callable) -> Callable:
     """ 
     키움증권 TR 데이터 조회 요청을 하는 함수는 이 decorator를 사용함으로써 
     과도한 조회로 인한 조회 실패를 방지하고, 연속조회가 실패하지 않도록 해야합니다.
+    첫번째 인자(self)의 _request_counter로 호출 횟수를 셉니다.
 
     Parameters
     ----------
@@ -65,26 +87,25 @@ def request_api_method(func: Callable) -> Callable:
         최근에 호출한 조회 API 횟수에 따라 잠깐 기다리는 closure를 반환합니다.
     """
     @wraps(func)
-    def wrapper(*args, **kwargs):
+    def wrapper(self, *args, **kwargs):
         # 만약 1초 내로 요청이 3번 이상 왔다면 1초 기다립니다.
-        global _request_api_num_per_second, _request_api_lock
-        with _request_api_lock:
-            if _request_api_num_per_second >= 3:
+        counter = self._request_counter
+        with counter.lock:
+            if counter.call_num >= counter.max_call_num:
                 logging.warning('너무 많은 조회 요청이 접수되어 1초 기다립니다.')
                 logging.warning('조회 요청의 경우 추가적인 제한에 걸릴 수 있으므로 로직을 수정하는 것을 권합니다.')
                 time.sleep(1)
-            _request_api_num_per_second += 1
+            counter.call_num += 1
             # 연속 조회를 위해 함수를 lock안에서 실행합니다.
-            result = func(*args, **kwargs)
+            result = func(self, *args, **kwargs)
         return result
     return wrapper
 
-_order_api_num_per_second = 0
-_order_api_lock = threading.Lock()
 def order_api_method(func: Callable) -> Callable:
     """
     키움증권 주문 요청하는 함수는 이 decorator를 사용함으로써 
     과도한 주문으로 인한 주문 실패를 방지해야합니다.
+    첫번째 인자(self)의 _order_counter로 호출 횟수를 셉니다.
 
     Parameters
     ----------
@@ -97,25 +118,44 @@ def order_api_method(func: Callable) -> Callable:
         최근에 호출한 주문 API 횟수에 따라 잠깐 기다리는 closure를 반환합니다.
     """
     @wraps(func)
-    def wrapper(*args, **kwargs):
+    def wrapper(self, *args, **kwargs):
         # 만약 1초 내로 주문 요청이 3번 이상 왔다면 1초 기다립니다.
-        global _order_api_num_per_second, _order_api_lock
-        with _order_api_lock:
-            if _order_api_num_per_second >= 3:
+        counter = self._order_counter
+        with counter.lock:
+            if counter.call_num >= counter.max_call_num:
                 logging.warning('너무 많은 주문 요청이 접수되어 1초 기다립니다.')
                 time.sleep(1)
-            _order_api_num_per_second += 1
-        result = func(*args, **kwargs)
+            counter.call_num += 1
+        result = func(self, *args, **kwargs)
         return result
     return wrapper
 
-def reset_API_call_count():
+def count_continued_request(counter: APICallCounter):
+    """
+    연속조회로 인해 추가로 발생한 조회 요청을 횟수에 포함시킵니다.
+    request_api_method가 적용된 함수 안에서만 호출되어야 합니다.
+
+    Parameters
+    ----------
+    counter : APICallCounter
+        조회 요청 횟수를 세는 counter입니다.
+    """
+    # request_api_method의 lock을 이미 잡고 있으므로 다시 잡지 않습니다.
+    if counter.call_num >= counter.max_call_num:
+        logging.warning('연속조회 요청이 많아 1초 기다립니다.')
+        time.sleep(1)
+    counter.call_num += 1
+
+def reset_API_call_count(*counters: APICallCounter):
     """
     API 호출 횟수를 1초마다 초기화해줍니다.
+
+    Parameters
+    ----------
+    *counters : APICallCounter
+        초기화할 counter들입니다.
     """
-    global _order_api_num_per_second
-    global _request_api_num_per_second
     while True:
         time.sleep(1)
-        _order_api_num_per_second = 0
-        _request_api_num_per_second = 0
\ No newline at end of file
+        for counter in counters:
+            counter.call_num = 0
@@ -0,0 +1,368 @@
+import logging
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Callable
+from ..utils import get_kiwoom_price, get_shifted_kiwoom_price
+from .records import OrderResult
+
+logger = logging.getLogger(__name__)
+
+class OrderRejectedError(Exception):
+    """
+    주문 전 검사를 통과하지 못해 주문이 전송되지 않았을 때 발생하는 예외
+    """
+
+class OrderChecker():
+    """
+    주문을 프록시로 보내기 전에 등록된 검사들을 순서대로 실행하는 클래스
+
+    검사는 check(order_dict, checker) 형태로 호출되는 Callable이며,
+    통과한 주문(가격이 보정될 수 있음)을 반환하거나 OrderRejectedError를 발생시킵니다.
+    검사에 필요한 보유수량, 현재가, 미체결 주문, 주문가능금액 추정치 등은 이 클래스가 관리합니다.
+    여러 쓰레드가 동시에 메서드를 호출해도 안전합니다.
+    """
+
+    _max_early_results = 1000
+
+    def __init__(self, get_balance: Callable, get_last_price: Callable):
+        """
+        Parameters
+        ----------
+        get_balance : Callable
+            get_balance(stock_code)로 호출되어 보유주식정보 dict나 None을 반환합니다.
+        get_last_price : Callable
+            get_last_price(stock_code)로 호출되어 마지막으로 받은 현재가나 None을 반환합니다.
+        """
+        self.get_balance = get_balance
+        self.get_last_price = get_last_price
+        self._checks = []
+        # open_orders[order_number] = {'구분': str, '주식코드': str, '가격': int, '미체결수량': int, '체결량': int}
+        self._open_orders = {}
+        self._early_results = {}
+        self._cash = None
+        self._history = defaultdict(deque)
+        self._next_token = 0
+        self._lock = threading.RLock()
+
+    def add_check(self, check: Callable) -> None:
+        """
+        주문 전 검사를 추가합니다. 검사는 추가된 순서대로 실행됩니다.
+
+        Parameters
+        ----------
+        check : Callable
+            check(order_dict, checker) 형태로 호출되어 통과한 order_dict를 반환합니다.
+            주문을 거절하려면 OrderRejectedError를 발생시켜야 합니다.
+        """
+        with self._lock:
+            self._checks.append(check)
+
+    def run(self, order_dict: dict) -> tuple[dict, str]:
+        """
+        등록된 검사를 순서대로 실행하고, 통과한 주문을 미체결 주문으로 임시 등록합니다.
+
+        Parameters
+        ----------
+        order_dict : dict
+            send_order에 전달된 주문입니다.
+
+        Returns
+        -------
+        tuple[dict, str]
+            검사를 통과한 주문과 임시 주문 번호를 반환합니다.
+            주문이 전송된 후에는 임시 주문 번호로 register_order를 호출해야 합니다.
+        """
+        with self._lock:
+            for check in self._checks:
+                order_dict = check(order_dict, self)
+            token = f'_{self._next_token}'
+            self._next_token += 1
+            self._open_orders[token] = {
+                '구분': order_dict['구분'],
+                '주식코드': order_dict['주식코드'],
+                '가격': self.get_order_price(order_dict),
+                '미체결수량': order_dict['수량'],
+                '체결량': 0,
+                'history_entry': (time.monotonic(), _get_order_key(order_dict)),
+            }
+            self._history[order_dict['주식코드']].append(self._open_orders[token]['history_entry'])
+        return order_dict, token
+
+    def register_order(self, token: str, order_number: str | None) -> None:
+        """
+        임시로 등록된 주문에 실제 주문 번호를 부여합니다.
+        order_number가 None이면 주문이 전송되지 않은 것으로 보고 임시 등록과 주문 기록을 취소합니다.
+
+        Parameters
+        ----------
+        token : str
+            run이 반환한 임시 주문 번호입니다.
+        order_number : str | None
+            send_order로 얻은 주문 번호입니다.
+        """
+        with self._lock:
+            open_order = self._open_orders.pop(token)
+            if order_number is None:
+                history = self._history[open_order['주식코드']]
+                if open_order['history_entry'] in history:
+                    history.remove(open_order['history_entry'])
+                return
+            self._open_orders[order_number] = open_order
+            # 주문 번호를 받기 전에 먼저 도착한 체결 정보를 반영합니다.
+            if order_number in self._early_results:
+                self.update_order(order_number, self._early_results.pop(order_number))
+
+    def update_order(self, order_number: str, order_result: OrderResult) -> None:
+        """
+        체결 정보를 받아 미체결 주문과 주문가능금액 추정치를 갱신합니다.
+
+        Parameters
+        ----------
+        order_number : str
+            주문 번호입니다.
+        order_result : OrderResult
+            프록시로부터 받은 주문 정보입니다.
+        """
+        with self._lock:
+            open_order = self._open_orders.get(order_number)
+            if open_order is None:
+                self._early_results[order_number] = order_result
+                if len(self._early_results) > self._max_early_results:
+                    del self._early_results[next(iter(self._early_results))]
+                return
+            # 체결량은 누적값이므로 늘어난 만큼만 새로 체결된 것입니다.
+            # 체결 없이 미체결수량이 줄었다면 취소된 것이므로 묶여있던 금액만 풀어줍니다.
+            # 빠진 값(None)은 변화가 없는 것으로 봅니다.
+            executed_quantity = order_result.executed_quantity
+            if executed_quantity is not None and executed_quantity > open_order['체결량']:
+                if self._cash is not None:
+                    executed_price = order_result.executed_price
+                    if executed_price is None:
+                        executed_price = open_order['가격']
+                    amount = executed_price * (executed_quantity - open_order['체결량'])
+                    if open_order['구분'] == '매수':
+                        self._cash -= amount
+                    else:
+                        self._cash += amount
+                open_order['체결량'] = executed_quantity
+            if order_result.unexecuted_quantity is not None:
+                open_order['미체결수량'] = order_result.unexecuted_quantity
+            if open_order['미체결수량'] <= 0:
+                del self._open_orders[order_number]
+
+    def set_cash(self, cash: int) -> None:
+        """
+        주문가능금액을 동기화합니다.
+        서버의 주문가능금액에는 이미 미체결 주문이 반영되어 있으므로 현재 미체결 매수 주문을 제외한 값을 기준으로 삼습니다.
+
+        Parameters
+        ----------
+        cash : int
+            get_deposit으로 얻은 주문가능금액입니다.
+        """
+        with self._lock:
+            self._cash = cash + self._get_reserved_cash()
+
+    def get_available_cash(self) -> int | None:
+        """
+        추정한 주문가능금액을 반환합니다.
+
+        Returns
+        -------
+        int | None
+            set_cash가 한번도 호출되지 않았다면 None을 반환합니다.
+        """
+        with self._lock:
+            if self._cash is None:
+                return None
+            return self._cash - self._get_reserved_cash()
+
+    def get_pending_quantity(self, stock_code: str, order_type: str) -> int:
+        """
+        주어진 종목의 미체결 주문 수량을 반환합니다.
+
+        Parameters
+        ----------
+        stock_code : str
+            주식 코드입니다.
+        order_type : str
+            '매수' 또는 '매도'입니다.
+
+        Returns
+        -------
+        int
+            미체결 주문 수량의 합입니다.
+        """
+        with self._lock:
+            return sum(
+                open_order['미체결수량'] for open_order in self._open_orders.values()
+                if open_order['주식코드'] == stock_code and open_order['구분'] == order_type
+            )
+
+    def get_recent_orders(self, stock_code: str, period: float) -> list[tuple]:
+        """
+        주어진 종목에 대해 최근 period초 동안 검사를 통과한 주문들을 반환합니다.
+
+        Parameters
+        ----------
+        stock_code : str
+            주식 코드입니다.
+        period : float
+            조회할 기간(초)입니다.
+
+        Returns
+        -------
+        list[tuple]
+            (구분, 주식코드, 수량, 가격, 시장가) 형태의 주문 리스트입니다.
+        """
+        now = time.monotonic()
+        with self._lock:
+            history = self._history[stock_code]
+            # 오래된 기록은 어떤 검사에도 쓰이지 않도록 60초가 지나면 지웁니다.
+            while history and now - history[0][0] > max(period, 60):
+                history.popleft()
+            return [order_key for timestamp, order_key in history if now - timestamp <= period]
+
+    def get_order_price(self, order_dict: dict) -> int:
+        """
+        주문의 예상 체결가를 반환합니다.
+        시장가 주문은 마지막으로 받은 현재가를 사용하며, 현재가를 모르면 0을 반환합니다.
+
+        Parameters
+        ----------
+        order_dict : dict
+            send_order에 전달된 주문입니다.
+
+        Returns
+        -------
+        int
+            예상 체결가입니다.
+        """
+        if not order_dict['시장가']:
+            return order_dict['가격']
+        last_price = self.get_last_price(order_dict['주식코드'])
+        return 0 if last_price is None else last_price
+
+    def _get_reserved_cash(self) -> int:
+        return sum(
+            open_order['가격'] * open_order['미체결수량'] for open_order in self._open_orders.values()
+            if open_order['구분'] == '매수'
+        )
+
+def _get_order_key(order_dict: dict) -> tuple:
+    return (order_dict['구분'], order_dict['주식코드'], order_dict['수량'], order_dict['가격'], order_dict['시장가'])
+
+class TickSizeCheck():
+    """
+    지정가 주문의 가격이 호가 단위에 맞는지 검사합니다.
+    round_price가 True라면 거절하는 대신 불리하지 않은 방향의 호가로 가격을 보정합니다.
+    (매수는 아래 호가, 매도는 위 호가)
+    """
+
+    def __init__(self, round_price: bool = False):
+        self.round_price = round_price
+
+    def __call__(self, order_dict: dict, checker: OrderChecker) -> dict:
+        if order_dict['시장가']:
+            return order_dict
+        price = order_dict['가격']
+        kiwoom_price = get_kiwoom_price(price)
+        if kiwoom_price == price:
+            return order_dict
+        if not self.round_price:
+            raise OrderRejectedError(f'{price}원은 호가 단위에 맞지 않는 가격입니다.')
+        if order_dict['구분'] == '매도':
+            kiwoom_price = get_shifted_kiwoom_price(kiwoom_price, 1)
+        return order_dict | {'가격': kiwoom_price}
+
+class MaxNotionalCheck():
+    """
+    주문 금액(예상 체결가 x 수량)이 max_notional 이하인지 검사합니다.
+    현재가를 모르는 시장가 주문은 금액을 알 수 없으므로 거절합니다.
+    """
+
+    def __init__(self, max_notional: int):
+        self.max_notional = max_notional
+
+    def __call__(self, order_dict: dict, checker: OrderChecker) -> dict:
+        price = checker.get_order_price(order_dict)
+        if price == 0:
+            raise OrderRejectedError(f'{order_dict["주식코드"]}의 현재가를 몰라 주문 금액을 계산할 수 없습니다.')
+        notional = price * order_dict['수량']
+        if notional > self.max_notional:
+            raise OrderRejectedError(f'주문 금액 {notional}원이 한도 {self.max_notional}원을 초과합니다.')
+        return order_dict
+
+class PositionLimitCheck():
+    """
+    매수 주문의 경우 보유수량과 미체결 매수 수량을 더한 수량이 max_quantity 이하인지 검사합니다.
+    매도 주문의 경우 보유수량에서 미체결 매도 수량을 뺀 수량을 넘지 않는지 검사합니다.
+    주문가능수량에는 서버가 접수한 매도 주문이 이미 빠져있어 미체결 매도 수량을 두번 빼게 되므로 보유수량을 기준으로 삼습니다.
+    """
+
+    def __init__(self, max_quantity: int):
+        self.max_quantity = max_quantity
+
+    def __call__(self, order_dict: dict, checker: OrderChecker) -> dict:
+        stock_code = order_dict['주식코드']
+        stock_info = checker.get_balance(stock_code)
+        if order_dict['구분'] == '매수':
+            holding = 0 if stock_info is None else stock_info['보유수량']
+            quantity = holding + checker.get_pending_quantity(stock_code, '매수') + order_dict['수량']
+            if quantity > self.max_quantity:
+                raise OrderRejectedError(f'{stock_code}의 보유 예정 수량 {quantity}주가 한도 {self.max_quantity}주를 초과합니다.')
+        else:
+            sellable = 0 if stock_info is None else stock_info['보유수량']
+            sellable -= checker.get_pending_quantity(stock_code, '매도')
+            if order_dict['수량'] > sellable:
+                raise OrderRejectedError(f'{stock_code}의 매도 가능 수량은 {sellable}주입니다.')
+        return order_dict
+
+class CashCheck():
+    """
+    매수 주문 금액이 추정한 주문가능금액 이하인지 검사합니다.
+    주문가능금액은 get_deposit을 호출할 때마다 동기화되며, 그 사이에는 체결 정보로 추정합니다.
+    get_deposit을 한번도 호출하지 않았다면 검사하지 않습니다.
+    """
+
+    def __call__(self, order_dict: dict, checker: OrderChecker) -> dict:
+        if order_dict['구분'] != '매수':
+            return order_dict
+        cash = checker.get_available_cash()
+        if cash is None:
+            logger.warning('주문가능금액이 동기화되지 않아 검사를 건너뜁니다. get_deposit을 먼저 호출해주세요.')
+            return order_dict
+        notional = checker.get_order_price(order_dict) * order_dict['수량']
+        if notional > cash:
+            raise OrderRejectedError(f'주문 금액 {notional}원이 추정 주문가능금액 {cash}원을 초과합니다.')
+        return order_dict
+
+class ThrottleCheck():
+    """
+    한 종목에 대해 period초 동안 max_orders개를 넘는 주문이 나가지 않도록 합니다.
+    """
+
+    def __init__(self, max_orders: int, period: float = 1.0):
+        self.max_orders = max_orders
+        self.period = period
+
+    def __call__(self, order_dict: dict, checker: OrderChecker) -> dict:
+        recent_orders = checker.get_recent_orders(order_dict['주식코드'], self.period)
+        if len(recent_orders) >= self.max_orders:
+            raise OrderRejectedError(f'{order_dict["주식코드"]}에 대해 {self.period}초 동안 {self.max_orders}번을 초과하여 주문할 수 없습니다.')
+        return order_dict
+
+class DuplicateCheck():
+    """
+    period초 안에 같은 구분, 종목, 수량, 가격의 주문이 이미 나갔다면 거절합니다.
+    """
+
+    def __init__(self, period: float = 1.0):
+        self.period = period
+
+    def __call__(self, order_dict: dict, checker: OrderChecker) -> dict:
+        recent_orders = checker.get_recent_orders(order_dict['주식코드'], self.period)
+        if _get_order_key(order_dict) in recent_orders:
+            raise OrderRejectedError(f'{self.period}초 안에 같은 주문이 이미 전송되었습니다.')
+        return order_dict
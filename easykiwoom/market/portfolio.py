@@ -0,0 +1,218 @@
+import logging
+import threading
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+class Portfolio():
+    """
+    보유 주식의 평가금액과 평가손익을 실시간으로 계산하는 클래스
+
+    잔고 변화와 실시간 가격 정보가 들어올 때마다 해당 종목의 기여분만 갱신하므로
+    포트폴리오 전체의 합계는 보유 종목 수와 상관없이 O(1)에 얻을 수 있습니다.
+    여러 쓰레드가 동시에 메서드를 호출해도 안전합니다.
+    """
+
+    def __init__(self):
+        # positions[stock_code] = [보유수량, 매입단가, 현재가]
+        self._positions = {}
+        self._last_prices = {}
+        self._total_value = 0
+        self._total_cost = 0
+        self._callbacks = []
+        self._lock = threading.Lock()
+
+    def reset(self, balance: dict[str, dict]) -> None:
+        """
+        주어진 잔고로 포트폴리오를 초기화합니다.
+
+        Parameters
+        ----------
+        balance : dict[str, dict]
+            Market.get_balance가 반환하는 형식의 잔고입니다.
+        """
+        with self._lock:
+            self._positions = {}
+            self._total_value = 0
+            self._total_cost = 0
+        for stock_code, stock_info in balance.items():
+            self.update_position(stock_code, stock_info['보유수량'], stock_info['매입단가'])
+
+    def update_position(self, stock_code: str, quantity: int, purchase_price: int) -> None:
+        """
+        종목의 보유수량과 매입단가를 갱신합니다.
+        보유수량이 0이면 종목을 포트폴리오에서 제외합니다.
+
+        Parameters
+        ----------
+        stock_code : str
+            주식 코드입니다.
+        quantity : int
+            보유수량입니다.
+        purchase_price : int
+            매입단가입니다.
+        """
+        with self._lock:
+            if stock_code in self._positions:
+                old_quantity, old_purchase_price, price = self._positions.pop(stock_code)
+                self._total_value -= old_quantity * price
+                self._total_cost -= old_quantity * old_purchase_price
+            else:
+                # 실시간 가격이 아직 없다면 매입단가로 평가합니다.
+                price = self._last_prices.get(stock_code, purchase_price)
+            if quantity != 0:
+                self._positions[stock_code] = [quantity, purchase_price, price]
+                self._total_value += quantity * price
+                self._total_cost += quantity * purchase_price
+            triggered = self._get_triggered_callbacks(stock_code)
+        self._run_callbacks(triggered)
+
+    def update_price(self, stock_code: str, price: int) -> None:
+        """
+        종목의 현재가를 갱신합니다.
+
+        Parameters
+        ----------
+        stock_code : str
+            주식 코드입니다.
+        price : int
+            현재가입니다.
+        """
+        with self._lock:
+            self._last_prices[stock_code] = price
+            position = self._positions.get(stock_code)
+            if position is None:
+                return
+            self._total_value += position[0] * (price - position[2])
+            position[2] = price
+            triggered = self._get_triggered_callbacks(stock_code)
+        self._run_callbacks(triggered)
+
+    def get_summary(self) -> dict:
+        """
+        포트폴리오 전체의 평가 정보를 반환합니다.
+
+        Returns
+        -------
+        dict
+            summary = {
+                '평가금액': int,
+                '매입금액': int,
+                '평가손익': int,
+                '수익률': float,
+            }
+        """
+        with self._lock:
+            total_value, total_cost = self._total_value, self._total_cost
+        return {
+            '평가금액': total_value,
+            '매입금액': total_cost,
+            '평가손익': total_value - total_cost,
+            '수익률': _get_profit_rate(total_value, total_cost),
+        }
+
+    def get_position(self, stock_code: str) -> dict | None:
+        """
+        종목의 평가 정보를 반환합니다.
+
+        Parameters
+        ----------
+        stock_code : str
+            주식 코드입니다.
+
+        Returns
+        -------
+        dict | None
+            보유하지 않은 종목이면 None을 반환합니다.
+            position = {
+                '보유수량': int,
+                '매입단가': int,
+                '현재가': int,
+                '평가금액': int,
+                '평가손익': int,
+                '수익률': float,
+                '비중': float,
+            }
+        """
+        with self._lock:
+            if stock_code not in self._positions:
+                return None
+            quantity, purchase_price, price = self._positions[stock_code]
+            total_value = self._total_value
+        value, cost = quantity * price, quantity * purchase_price
+        return {
+            '보유수량': quantity,
+            '매입단가': purchase_price,
+            '현재가': price,
+            '평가금액': value,
+            '평가손익': value - cost,
+            '수익률': _get_profit_rate(value, cost),
+            '비중': value / total_value if total_value != 0 else 0.0,
+        }
+
+    def add_callback(self, callback: Callable, threshold: float,
+                     stock_code: str | None = None, is_below: bool = True) -> None:
+        """
+        수익률이 threshold를 넘어설 때 호출될 callback을 등록합니다.
+        callback은 수익률이 threshold를 넘어서는 순간 한번만 호출되며,
+        수익률이 다시 반대편으로 돌아오면 다시 호출될 수 있게 됩니다.
+
+        callback은 실시간 정보를 처리하는 쓰레드에서 호출되므로 빠르게 끝나야 합니다.
+
+        Parameters
+        ----------
+        callback : Callable
+            callback(stock_code, profit_rate) 형태로 호출됩니다.
+            포트폴리오 전체에 대한 callback이라면 stock_code는 None입니다.
+        threshold : float
+            기준 수익률입니다. -2%의 경우 -0.02로 전달해야 합니다.
+        stock_code : str | None, optional
+            감시할 주식 코드입니다.
+            Default로 None이며, 이 경우 포트폴리오 전체의 수익률을 감시합니다.
+        is_below : bool, optional
+            True일시 수익률이 threshold 이하로 떨어질 때 호출됩니다.
+            False일시 수익률이 threshold 이상으로 올라갈 때 호출됩니다.
+            Default로 True입니다.
+        """
+        with self._lock:
+            self._callbacks.append({
+                'callback': callback,
+                'threshold': threshold,
+                'stock_code': stock_code,
+                'is_below': is_below,
+                'is_triggered': False,
+            })
+
+    def _get_triggered_callbacks(self, stock_code: str) -> list[tuple]:
+        # lock을 잡은 상태에서 호출되어야 합니다.
+        triggered = []
+        for entry in self._callbacks:
+            if entry['stock_code'] is None:
+                profit_rate = _get_profit_rate(self._total_value, self._total_cost)
+            elif entry['stock_code'] == stock_code:
+                position = self._positions.get(stock_code)
+                if position is None:
+                    entry['is_triggered'] = False
+                    continue
+                quantity, purchase_price, price = position
+                profit_rate = _get_profit_rate(quantity * price, quantity * purchase_price)
+            else:
+                continue
+            if entry['is_below']:
+                is_crossed = profit_rate <= entry['threshold']
+            else:
+                is_crossed = profit_rate >= entry['threshold']
+            if is_crossed and not entry['is_triggered']:
+                triggered.append((entry['callback'], entry['stock_code'], profit_rate))
+            entry['is_triggered'] = is_crossed
+        return triggered
+
+    def _run_callbacks(self, triggered: list[tuple]) -> None:
+        for callback, stock_code, profit_rate in triggered:
+            try:
+                callback(stock_code, profit_rate)
+            except Exception:
+                logger.exception('포트폴리오 callback 실행 중 오류가 발생했습니다.')
+
+def _get_profit_rate(value: int, cost: int) -> float:
+    return (value - cost) / cost if cost != 0 else 0.0
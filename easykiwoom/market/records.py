@@ -0,0 +1,184 @@
+from collections.abc import Mapping
+from operator import attrgetter, itemgetter
+
+class Record(Mapping):
+    """
+    프록시로부터 받은 정보를 담는 가벼운 읽기 전용 레코드의 기반 클래스
+
+    값은 __slots__에 영문 속성으로 저장되어 dict보다 메모리를 적게 사용하고 접근이 빠릅니다.
+    기존 코드와의 호환을 위해 record['현재가']와 같이 한글 key로 접근하는 dict 형태의 읽기도 지원합니다.
+    수정 가능한 dict가 필요하다면 to_dict를 사용해야 합니다.
+
+    프록시가 보낸 정보에 정해진 key가 없다면 해당 값은 None이 되며,
+    정해지지 않은 key는 버리지 않고 함께 보관하여 한글 key로 읽거나 to_dict로 얻을 수 있습니다.
+    """
+
+    __slots__ = ('_extra',)
+    _fields: tuple[str, ...] = ()
+    _keys: tuple[str, ...] = ()
+    _key_to_field: dict[str, str] = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._key_to_field = dict(zip(cls._keys, cls._fields))
+        cls._get_values = staticmethod(itemgetter(*cls._keys))
+        cls._get_fields = staticmethod(attrgetter(*cls._fields))
+
+    @classmethod
+    def from_dict(cls, info_dict: Mapping):
+        """
+        한글 key를 가진 dict로부터 레코드를 만듭니다.
+
+        Parameters
+        ----------
+        info_dict : Mapping
+            프록시로부터 받은 정보입니다.
+
+        Returns
+        -------
+        Record
+            info_dict의 값을 담은 레코드입니다.
+            info_dict에 없는 key의 값은 None이 됩니다.
+        """
+        # 대부분의 정보는 정해진 key만 가지고 있으므로 빠진 key와 추가 key를 찾는 과정을 건너뜁니다.
+        if len(info_dict) == len(cls._keys):
+            try:
+                record = cls(*cls._get_values(info_dict))
+            except KeyError:
+                pass
+            else:
+                record._extra = None
+                return record
+        record = cls(*[info_dict.get(key) for key in cls._keys])
+        extra = {key: value for key, value in info_dict.items() if key not in cls._key_to_field}
+        record._extra = extra or None
+        return record
+
+    def _get_extra(self) -> dict:
+        return getattr(self, '_extra', None) or {}
+
+    def to_dict(self) -> dict:
+        """
+        한글 key를 가진 dict로 변환합니다.
+
+        Returns
+        -------
+        dict
+            레코드의 값을 담은 새로운 dict입니다.
+        """
+        return self._add_extra(dict(zip(self._keys, self._get_fields(self))))
+
+    def _add_extra(self, info_dict: dict) -> dict:
+        extra = getattr(self, '_extra', None)
+        if extra:
+            info_dict.update(extra)
+        return info_dict
+
+    def __getitem__(self, key: str):
+        try:
+            field = self._key_to_field[key]
+        except KeyError:
+            try:
+                return self._get_extra()[key]
+            except KeyError:
+                raise KeyError(key) from None
+        return getattr(self, field)
+
+    def __iter__(self):
+        yield from self._keys
+        yield from self._get_extra()
+
+    def __len__(self) -> int:
+        return len(self._keys) + len(self._get_extra())
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}({self.to_dict()})'
+
+    def __reduce__(self):
+        return (type(self).from_dict, (self.to_dict(),))
+
+class PriceInfo(Record):
+    """
+    실시간 가격 정보
+    """
+
+    __slots__ = ('current_price', 'open_price', 'high_price', 'low_price')
+    _fields = __slots__
+    _keys = ('현재가', '시가', '고가', '저가')
+
+    def __init__(self, current_price: int, open_price: int, high_price: int, low_price: int):
+        self.current_price = current_price
+        self.open_price = open_price
+        self.high_price = high_price
+        self.low_price = low_price
+
+    def to_dict(self) -> dict:
+        # get_price_info마다 호출되므로 key를 직접 나열하여 빠르게 변환합니다.
+        return self._add_extra({
+            '현재가': self.current_price,
+            '시가': self.open_price,
+            '고가': self.high_price,
+            '저가': self.low_price,
+        })
+
+class AskBidInfo(Record):
+    """
+    실시간 호가 정보
+
+    bids와 asks에는 [가격, 수량]의 호가정보가 1번부터 10번까지 순서대로 들어있습니다.
+    호가정보는 프록시로부터 받은 리스트를 복사하지 않고 그대로 사용합니다.
+    """
+
+    __slots__ = ('bids', 'asks')
+    _fields = __slots__
+    _keys = ('매수호가정보', '매도호가정보')
+
+    def __init__(self, bids: list[list[int]], asks: list[list[int]]):
+        self.bids = bids
+        self.asks = asks
+
+    def to_dict(self) -> dict:
+        # get_ask_bid_info마다 호출되므로 key를 직접 나열하여 빠르게 변환합니다.
+        return self._add_extra({
+            '매수호가정보': self.bids,
+            '매도호가정보': self.asks,
+        })
+
+class OrderResult(Record):
+    """
+    주문 체결 정보
+    """
+
+    __slots__ = ('stock_code', 'stock_name', 'order_status', 'order_type', 'order_quantity',
+                 'executed_price', 'executed_quantity', 'unexecuted_quantity', 'order_number')
+    _fields = __slots__
+    _keys = ('종목코드', '종목명', '주문상태', '주문구분', '주문수량',
+             '체결가', '체결량', '미체결수량', '주문번호')
+
+    def __init__(self, stock_code: str, stock_name: str, order_status: str, order_type: str, order_quantity: int,
+                 executed_price: int, executed_quantity: int, unexecuted_quantity: int, order_number: str):
+        self.stock_code = stock_code
+        self.stock_name = stock_name
+        self.order_status = order_status
+        self.order_type = order_type
+        self.order_quantity = order_quantity
+        self.executed_price = executed_price
+        self.executed_quantity = executed_quantity
+        self.unexecuted_quantity = unexecuted_quantity
+        self.order_number = order_number
+
+class BalanceEntry(Record):
+    """
+    보유주식정보
+    """
+
+    __slots__ = ('stock_code', 'stock_name', 'quantity', 'sellable_quantity', 'purchase_price')
+    _fields = __slots__
+    _keys = ('종목코드', '종목명', '보유수량', '주문가능수량', '매입단가')
+
+    def __init__(self, stock_code: str, stock_name: str, quantity: int, sellable_quantity: int, purchase_price: int):
+        self.stock_code = stock_code
+        self.stock_name = stock_name
+        self.quantity = quantity
+        self.sellable_quantity = sellable_quantity
+        self.purchase_price = purchase_price